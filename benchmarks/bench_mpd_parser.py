@@ -23,16 +23,14 @@ def read_bytes_from_url(url: str) -> bytes:
         return resp.read()
 
 
-def read_text(path: Optional[str], url: Optional[str]) -> str:
+def read_bytes(path: Optional[str], url: Optional[str]) -> bytes:
     if bool(path) == bool(url):
         raise SystemExit("Provide exactly one of --file or --url")
 
     if path:
-        data = open(path, "rb").read()
-    else:
-        data = read_bytes_from_url(url)  # type: ignore[arg-type]
-
-    return data.decode("utf-8", errors="replace")
+        with open(path, "rb") as manifest_file:
+            return manifest_file.read()
+    return read_bytes_from_url(url)  # type: ignore[arg-type]
 
 
 def extract_reps_and_bandwidths(mpd) -> Tuple[int, List[int]]:
@@ -65,19 +63,20 @@ def main() -> None:
     ap.add_argument("--url", help="URL to MPD")
     ap.add_argument("--iters", type=int, default=300)
     ap.add_argument("--warmup", type=int, default=50)
+    ap.add_argument("--eager", action="store_true", help="Materialize every value while parsing")
     args = ap.parse_args()
 
-    mpd_xml = read_text(args.file, args.url)
+    mpd_xml = read_bytes(args.file, args.url)
 
     # Warmup
     for _ in range(args.warmup):
-        _ = Parser.from_string(mpd_xml)
+        _ = Parser.from_bytes(mpd_xml, eager=args.eager)
 
     # Timed
     t0 = time.perf_counter()
     last_mpd = None
     for _ in range(args.iters):
-        last_mpd = Parser.from_string(mpd_xml)
+        last_mpd = Parser.from_bytes(mpd_xml, eager=args.eager)
     t1 = time.perf_counter()
 
     if last_mpd is None:
@@ -93,6 +92,7 @@ def main() -> None:
     print(f"input:  {'file ' + args.file if args.file else 'url  ' + args.url}")
     print(f"warmup: {args.warmup}")
     print(f"iters:  {args.iters}")
+    print(f"eager:  {args.eager}")
     print(f"reps:   {rep_count}")
     if bandwidths_sorted:
         print(f"bandwidth sample (bps): {bandwidths_sorted[:8]}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark a live refresh: MPD.update_from against parsing the new manifest again.
+
+Every iteration slides a generated live window by one segment, like a dynamic manifest
+fetched every minimumUpdatePeriod. Both paths parse the new payload, the update path then
+moves the existing Tag objects to it, the reparse path reads every value again.
+
+Usage:
+  python benchmarks/bench_update_from.py
+  python benchmarks/bench_update_from.py --segments 1800 --adaptation-sets 2 --representations 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+from mpd_parser.parser import Parser
+
+
+def live_window(first: int, segments: int, adaptation_sets: int, representations: int) -> bytes:
+    """a dynamic manifest whose timelines start at segment `first`"""
+    sets = []
+    for set_index in range(adaptation_sets):
+        entries = "".join(f'<S t="{(first + index) * 2000}" d="2000"/>' for index in range(segments))
+        ladder = "".join(
+            f'<Representation id="{set_index}-{index}" bandwidth="{(index + 1) * 500000}" codecs="avc1.64001f"/>'
+            for index in range(representations)
+        )
+        sets.append(
+            f'<AdaptationSet id="{set_index}" mimeType="video/mp4">'
+            f'<SegmentTemplate timescale="1000" media="$Time$.m4s" startNumber="{first + 1}">'
+            f"<SegmentTimeline>{entries}</SegmentTimeline></SegmentTemplate>{ladder}</AdaptationSet>"
+        )
+    return (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="2024-01-01T00:00:00Z" '
+        f'minimumUpdatePeriod="PT2S" timeShiftBufferDepth="PT3600S" publishTime="{first}">'
+        f'<Period id="p0" start="PT0S">{"".join(sets)}</Period></MPD>'
+    ).encode()
+
+
+def read_values(mpd, read_segments: bool) -> int:
+    """what a packager reads after every refresh: the ladder, the templates and optionally the Segment tags"""
+    total = 0
+    for period in mpd.periods:
+        for aset in period.adaptation_sets:
+            template = aset.segment_template
+            total += template.timescale + template.start_number + len(template.media)
+            if read_segments:
+                total += len(template.segment_timeline.segments)
+            for rep in aset.representations:
+                total += rep.bandwidth + len(rep.codecs)
+    return total
+
+
+def timed(step: Callable[[bytes], None], payloads: List[bytes]) -> float:
+    """average milliseconds of step over the payloads"""
+    started = time.perf_counter()
+    for payload in payloads:
+        step(payload)
+    return (time.perf_counter() - started) / len(payloads) * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--segments", type=int, default=1800, help="S entries per SegmentTimeline")
+    ap.add_argument("--adaptation-sets", type=int, default=2)
+    ap.add_argument("--representations", type=int, default=8, help="Representations per AdaptationSet")
+    ap.add_argument("--iters", type=int, default=100)
+    ap.add_argument("--read-segments", action="store_true", help="Also read the Segment tags of every timeline")
+    args = ap.parse_args()
+
+    def read(mpd) -> int:
+        return read_values(mpd, args.read_segments)
+
+    payloads = [
+        live_window(first, args.segments, args.adaptation_sets, args.representations)
+        for first in range(args.iters + 1)
+    ]
+    parsed = [Parser.from_bytes(payload) for payload in payloads[1:]]
+
+    parse_ms = timed(Parser.from_bytes, payloads[1:])
+    reparse_ms = timed(lambda payload: read(Parser.from_bytes(payload)), payloads[1:])
+
+    mpd = Parser.from_bytes(payloads[0])
+    read(mpd)
+    updates = iter(parsed)
+    update_ms = timed(lambda _: mpd.update_from(next(updates)), payloads[1:])
+
+    mpd = Parser.from_bytes(payloads[0])
+    read(mpd)
+    refresh_ms = timed(lambda payload: read(mpd) if mpd.update_from(Parser.from_bytes(payload)) else 0, payloads[1:])
+
+    print("\n== update_from benchmark ==")
+    print(f"window: {args.adaptation_sets} x {args.segments} S, {args.representations} representations per set")
+    print(f"iters:  {args.iters}")
+    print(f"read segments: {args.read_segments}")
+    print(f"parse:                    {parse_ms:.3f} ms")
+    print(f"update_from:              {update_ms:.3f} ms")
+    print(f"refresh by reparse+read:  {reparse_ms:.3f} ms")
+    print(f"refresh by update+read:   {refresh_ms:.3f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+""" Minimal asyncio HTTP/1.1 client used to fetch manifests, with keep-alive connection pooling """
+import asyncio
+import ssl
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import SplitResult, urljoin, urlsplit
+
+from mpd_parser.exceptions import ManifestFetchError
+from mpd_parser.models.composite_tags import MPD
+
+USER_AGENT = "mpd-parser/1.0"
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_CONNECTIONS_PER_HOST = 8
+# URLs whose last parsed manifest is kept for conditional requests, each entry holds a full MPD
+DEFAULT_MAX_VALIDATED_MANIFESTS = 64
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+NOT_MODIFIED = 304
+
+# failures of a single exchange that are reported as ManifestFetchError
+FETCH_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError)
+
+# (scheme, host, port)
+HostKey = Tuple[str, str, int]
+
+
+def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict[str, str]:
+    """request headers that let the server answer 304 when the resource did not change"""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+@dataclass
+class HTTPResponse:
+    """A complete HTTP response, header names are lower-cased"""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    url: str  # final url, after redirects
+
+
+@dataclass
+class ValidatedManifest:
+    """A parsed manifest together with the validators its response carried"""
+
+    mpd: MPD
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """request headers that let the server answer 304 when the manifest did not change"""
+        return conditional_headers(self.etag, self.last_modified)
+
+
+@dataclass
+class _HostPool:
+    """idle keep-alive connections to a single host, and a bound on the open ones"""
+
+    limit: asyncio.Semaphore
+    idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = field(default_factory=list)
+
+
+class AsyncHTTPClient:
+    """
+        asyncio HTTP/1.1 client for GET requests.
+    Connections are kept alive and pooled per host, so polling many manifests on the same
+    origin does not pay a TCP (and TLS) handshake per request.
+    The client also remembers the last manifest parsed per URL with its ETag / Last-Modified,
+    see Parser.from_url_async. Only the max_validated_manifests most recently used URLs are kept,
+    0 turns conditional requests off.
+    A client belongs to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_validated_manifests: int = DEFAULT_MAX_VALIDATED_MANIFESTS,
+    ) -> None:
+        self.timeout = timeout
+        self.connections_per_host = connections_per_host
+        self.ssl_context = ssl_context
+        self.max_validated_manifests = max_validated_manifests
+        self.validated_manifests: "OrderedDict[str, ValidatedManifest]" = OrderedDict()
+        self._pools: Dict[HostKey, _HostPool] = {}
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """close every idle connection"""
+        for pool in self._pools.values():
+            while pool.idle:
+                _, writer = pool.idle.pop()
+                writer.close()
+        self._pools.clear()
+
+    def validated_manifest(self, url: str) -> Optional[ValidatedManifest]:
+        """the last manifest parsed from the url, None when it is not remembered"""
+        validated = self.validated_manifests.get(url)
+        if validated is not None:
+            self.validated_manifests.move_to_end(url)
+        return validated
+
+    def remember_manifest(self, url: str, validated: ValidatedManifest) -> None:
+        """keep the manifest parsed from the url, forgetting the least recently used ones over the limit"""
+        if self.max_validated_manifests <= 0:
+            return
+        self.validated_manifests[url] = validated
+        self.validated_manifests.move_to_end(url)
+        while len(self.validated_manifests) > self.max_validated_manifests:
+            self.validated_manifests.popitem(last=False)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+        """
+            Send a GET request, following redirects
+        Args:
+            url (str): http or https url
+            headers (dict): extra request headers
+
+        Returns:
+            HTTPResponse: the final response, any status
+
+        Raises:
+            ManifestFetchError: on connection failures, timeouts and malformed responses
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            try:
+                response = await asyncio.wait_for(self._request(url, headers or {}), self.timeout)
+            except FETCH_ERRORS as err:
+                raise ManifestFetchError(f"GET {url} failed") from err
+            location = response.headers.get("location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+        raise ManifestFetchError(f"too many redirects, last location {url}")
+
+    async def _request(self, url: str, headers: Dict[str, str]) -> HTTPResponse:
+        """one request / response exchange, moving on to another connection when a pooled one went stale"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported url {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        request = self._encode_request(parts, headers)
+
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(limit=asyncio.Semaphore(self.connections_per_host))
+        async with pool.limit:
+            while True:
+                reused = bool(pool.idle)
+                reader, writer = pool.idle.pop() if reused else await self._connect(key)
+                try:
+                    writer.write(request)
+                    await writer.drain()
+                    status, response_headers, body, keep_alive = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        # the server closed an idle connection, try the next one
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    pool.idle.append((reader, writer))
+                else:
+                    writer.close()
+                return HTTPResponse(status=status, headers=response_headers, body=body, url=url)
+
+    @staticmethod
+    def _encode_request(parts: SplitResult, headers: Dict[str, str]) -> bytes:
+        """GET request of the url, with the extra headers"""
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}", f"User-Agent: {USER_AGENT}"]
+        request_lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(request_lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _connect(self, key: HostKey) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """open a new connection to the host"""
+        scheme, host, port = key
+        if scheme == "https":
+            context = self.ssl_context or ssl.create_default_context()
+            return await asyncio.open_connection(host, port, ssl=context, server_hostname=host)
+        return await asyncio.open_connection(host, port)
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """read status, headers and body, the flag tells if the connection can be reused"""
+        version, status, *_ = (await reader.readuntil(b"\r\n")).decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = (await reader.readuntil(b"\r\n")).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        status = int(status)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        if status == NOT_MODIFIED or status == 204 or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    # optional trailers end with an empty line
+                    while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            # delimited by the end of the connection
+            body = await reader.read()
+            keep_alive = False
+        return status, headers, body, keep_alive
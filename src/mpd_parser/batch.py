@@ -0,0 +1,51 @@
+""" Picklable results of batch parsing, lxml elements cannot cross process boundaries """
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from mpd_parser.models.composite_tags import MPD
+
+# turns a parsed manifest into a picklable value inside the worker process
+Summarizer = Callable[[MPD], Any]
+
+
+@dataclass(frozen=True)
+class ManifestSummary:  # pylint: disable=too-many-instance-attributes
+    """Compact description of a manifest, the default result of Parser.parse_many"""
+
+    type: Optional[str]
+    profiles: Optional[str]
+    media_presentation_duration: Optional[str]
+    minimum_update_period: Optional[str]
+    publish_time: Optional[str]
+    periods: int
+    adaptation_sets: int
+    representations: int
+
+
+@dataclass
+class BatchResult:
+    """Outcome of parsing one file of a batch, either a value or the error that stopped it"""
+
+    path: str
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """True when the file was parsed and summarized, value holds the result"""
+        return self.error is None
+
+
+def summarize_manifest(mpd: MPD) -> ManifestSummary:
+    """default summarizer, counts the main tags and keeps the top level attributes"""
+    adaptation_sets = [adaptation_set for period in mpd.periods for adaptation_set in period.adaptation_sets]
+    return ManifestSummary(
+        type=mpd.type,
+        profiles=mpd.profiles,
+        media_presentation_duration=mpd.media_presentation_duration,
+        minimum_update_period=mpd.minimum_update_period,
+        publish_time=mpd.publish_time,
+        periods=len(mpd.periods),
+        adaptation_sets=len(adaptation_sets),
+        representations=sum(len(adaptation_set.representations) for adaptation_set in adaptation_sets),
+    )
@@ -1,13 +1,17 @@
 """ Namespace for constants used across the lib """
 
 # number constants
-DERIVED_ATTRIBUTES_CACHE_SIZE = 5
 ZERO_SECONDS = 0.0
 TWO_SECONDS = 2.0
 
+# MPD@type values
+DYNAMIC_TYPE = "dynamic"
+
 # parser constants
-KEYS_NOT_FOR_SETTING = ['element', 'tag_map', 'encoding']
+KEYS_NOT_FOR_SETTING = frozenset(('element', 'tag_map', 'encoding', '_derived_cache'))
 
 # xpath constants
 LOOKUP_STR_FORMAT = './*[local-name(.) = "{target}" ]'
 ANCESTOR_LOOKUP_STR_FORMAT = 'ancestor::*[local-name(.) = "{target}" ][1]'
+CHILD_AXIS = "child"
+ANCESTOR_AXIS = "ancestor"
@@ -0,0 +1,159 @@
+""" Structural comparison of two parsed manifests, e.g. consecutive versions of a live manifest """
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mpd_parser.models.base_tags import Tag
+from mpd_parser.models.composite_tags import MPD, SegmentTemplate
+from mpd_parser.timeline_utils import iter_timeline_runs
+
+# Representation values compared by diff
+REPRESENTATION_FIELDS = ("bandwidth", "codecs", "mime_type", "width", "height")
+
+# @id of the Period, AdaptationSet and Representation, ("position", index among siblings) when there is no id
+ElementPath = Tuple[Any, ...]
+POSITION_KEY = "position"
+
+
+@dataclass
+class RepresentationChange:
+    """A Representation present in both manifests whose compared values differ"""
+
+    path: ElementPath  # (period, adaptation set, representation)
+    changes: Dict[str, Tuple[Any, Any]]  # field name -> (old value, new value)
+
+
+@dataclass
+class TimelineChange:
+    """A SegmentTimeline whose covered range moved, times are in seconds"""
+
+    path: ElementPath  # (period, adaptation set) or (period, adaptation set, representation)
+    old_range: Tuple[float, float]
+    new_range: Tuple[float, float]
+
+    @property
+    def extended_by(self) -> float:
+        """how much later the timeline ends, negative when segments were removed from its end"""
+        return self.new_range[1] - self.old_range[1]
+
+    @property
+    def truncated_by(self) -> float:
+        """how much later the timeline starts, segments that left the live window"""
+        return self.new_range[0] - self.old_range[0]
+
+
+@dataclass
+class ManifestDiff:
+    """Changes between two manifests, false when there are none"""
+
+    added_periods: List[Any] = field(default_factory=list)
+    removed_periods: List[Any] = field(default_factory=list)
+    added_representations: List[ElementPath] = field(default_factory=list)
+    removed_representations: List[ElementPath] = field(default_factory=list)
+    changed_representations: List[RepresentationChange] = field(default_factory=list)
+    timeline_changes: List[TimelineChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return any(
+            (
+                self.added_periods,
+                self.removed_periods,
+                self.added_representations,
+                self.removed_representations,
+                self.changed_representations,
+                self.timeline_changes,
+            )
+        )
+
+
+def diff(mpd_a: MPD, mpd_b: MPD) -> ManifestDiff:
+    """
+        Compare two manifests structurally.
+    Periods, AdaptationSets and Representations are matched by @id through dict indexes,
+    falling back to their position among siblings, so the comparison is linear in the tree size.
+
+    Args:
+        mpd_a (MPD): the older manifest
+        mpd_b (MPD): the newer manifest
+
+    Returns:
+        ManifestDiff: added and removed Periods and Representations, changed Representations,
+            and SegmentTimelines that were extended or truncated
+    """
+    result = ManifestDiff()
+    old_periods = _index(mpd_a.periods)
+    new_periods = _index(mpd_b.periods)
+    result.removed_periods = [key for key in old_periods if key not in new_periods]
+    result.added_periods = [key for key in new_periods if key not in old_periods]
+
+    for period_key, new_period in new_periods.items():
+        old_period = old_periods.get(period_key)
+        if old_period is None:
+            continue
+        old_sets = _index(old_period.adaptation_sets)
+        new_sets = _index(new_period.adaptation_sets)
+        for set_key, new_set in new_sets.items():
+            old_set = old_sets.get(set_key)
+            if old_set is None:
+                result.added_representations += [
+                    (period_key, set_key, key) for key in _index(new_set.representations)
+                ]
+                continue
+            _diff_timeline(result, (period_key, set_key), old_set.segment_template, new_set.segment_template)
+            _diff_representations(result, (period_key, set_key), old_set, new_set)
+        for set_key, old_set in old_sets.items():
+            if set_key not in new_sets:
+                result.removed_representations += [
+                    (period_key, set_key, key) for key in _index(old_set.representations)
+                ]
+    return result
+
+
+def _index(tags: Iterable[Tag]) -> Dict[Any, Tag]:
+    """tags by @id, those without one by ("position", index), so an integer @id never meets a position"""
+    return {tag.id if tag.id is not None else (POSITION_KEY, position): tag for position, tag in enumerate(tags)}
+
+
+def _diff_representations(result: ManifestDiff, path: ElementPath, old_set: Tag, new_set: Tag) -> None:
+    """compare the Representations of two matched AdaptationSets"""
+    old_representations = _index(old_set.representations)
+    new_representations = _index(new_set.representations)
+    for key, new_representation in new_representations.items():
+        old_representation = old_representations.get(key)
+        if old_representation is None:
+            result.added_representations.append((*path, key))
+            continue
+        changes = {
+            name: (getattr(old_representation, name), getattr(new_representation, name))
+            for name in REPRESENTATION_FIELDS
+            if getattr(old_representation, name) != getattr(new_representation, name)
+        }
+        if changes:
+            result.changed_representations.append(RepresentationChange(path=(*path, key), changes=changes))
+        _diff_timeline(
+            result, (*path, key), old_representation.segment_template, new_representation.segment_template
+        )
+    result.removed_representations += [(*path, key) for key in old_representations if key not in new_representations]
+
+
+def _timeline_range(segment_template: Optional[SegmentTemplate]) -> Optional[Tuple[float, float]]:
+    """start and end of the explicit timeline in seconds, None when there is no SegmentTimeline"""
+    if segment_template is None or segment_template.segment_timeline is None:
+        return None
+    runs = list(iter_timeline_runs(segment_template.segment_timeline.iter_entries()))
+    if not runs:
+        return None
+    timescale = segment_template.timescale or 1
+    return runs[0].t / timescale, (runs[-1].t + runs[-1].count * runs[-1].d) / timescale
+
+
+def _diff_timeline(
+    result: ManifestDiff,
+    path: ElementPath,
+    old_template: Optional[SegmentTemplate],
+    new_template: Optional[SegmentTemplate],
+) -> None:
+    """record a timeline whose covered range changed"""
+    old_range = _timeline_range(old_template)
+    new_range = _timeline_range(new_template)
+    if old_range is not None and new_range is not None and old_range != new_range:
+        result.timeline_changes.append(TimelineChange(path=path, old_range=old_range, new_range=new_range))
@@ -0,0 +1,149 @@
+"""
+Persistent cache of parsed manifests, shared by the processes of a machine.
+Entries are MPDSnapshot buffers keyed by the hash of the manifest content and the library version,
+so repeated jobs over the same files load a snapshot instead of parsing the XML again.
+"""
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+from contextlib import suppress
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from mpd_parser.models.composite_tags import MPD
+from mpd_parser.parser import Parser
+from mpd_parser.parser_profiles import DEFAULT_PROFILE, ParserProfile
+from mpd_parser.snapshot import SNAPSHOT_MAGIC, MPDSnapshot
+
+# module level logger, application will configure formatting and handlers
+logger = logging.getLogger(__name__)
+
+try:
+    LIBRARY_VERSION = version("mpd-parser")
+except PackageNotFoundError:
+    # running from a source tree
+    LIBRARY_VERSION = "source"
+
+CACHE_ENTRY_SUFFIX = ".mpdsnap"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ManifestDiskCache:
+    """
+        Directory of MPDSnapshot entries in front of the Parser factories.
+    A hit reads the stored snapshot, a miss parses the manifest and stores its snapshot.
+    Entries are written to a temporary file and renamed into place, so processes sharing the
+    directory never read a partial entry. The least recently used entries are removed once the
+    directory grows over max_bytes, hits refresh an entry's modification time.
+    The size of the directory is counted as entries are stored, it is scanned only when the count
+    goes over max_bytes, which also picks up the entries other processes wrote and removed.
+
+    Example:
+        >>> cache = ManifestDiskCache("/var/cache/mpd-parser")
+        >>> snapshot = cache.load_file("manifests/bigBuckBunny-onDemend.mpd")
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        profile: ParserProfile = DEFAULT_PROFILE,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.profile = profile
+        self.hits = 0
+        self.misses = 0
+        # bytes of the entries as last counted, None until the first store scans the directory
+        self._directory_bytes: Optional[int] = None
+
+    @staticmethod
+    def key(manifest_as_bytes: bytes) -> str:
+        """cache key of a manifest, changes with its content, the library version and the snapshot format"""
+        digest = hashlib.sha256(manifest_as_bytes)
+        digest.update(LIBRARY_VERSION.encode("utf-8"))
+        digest.update(SNAPSHOT_MAGIC)
+        return digest.hexdigest()
+
+    def load_file(self, manifest_file_name: Union[str, os.PathLike]) -> MPDSnapshot:
+        """snapshot of a manifest file, parsed only when it is not cached"""
+        return self.load_bytes(Path(manifest_file_name).read_bytes())
+
+    def load_string(self, manifest_as_string: str) -> MPDSnapshot:
+        """snapshot of a manifest string, parsed with Parser.from_string when it is not cached"""
+        manifest_as_bytes = manifest_as_string.encode("utf-8")
+        return self._load(manifest_as_bytes, lambda: Parser.from_string(manifest_as_string, profile=self.profile))
+
+    def load_bytes(self, manifest_as_bytes: bytes) -> MPDSnapshot:
+        """snapshot of a raw manifest, parsed with Parser.from_bytes when it is not cached"""
+        return self._load(manifest_as_bytes, lambda: Parser.from_bytes(manifest_as_bytes, profile=self.profile))
+
+    def clear(self) -> None:
+        """remove every entry"""
+        for entry in self.directory.glob(f"*{CACHE_ENTRY_SUFFIX}"):
+            entry.unlink(missing_ok=True)
+        self._directory_bytes = None
+
+    def _load(self, manifest_as_bytes: bytes, parse: Callable[[], MPD]) -> MPDSnapshot:
+        """read the entry of the manifest, or parse it and store a new one"""
+        path = self.directory / f"{self.key(manifest_as_bytes)}{CACHE_ENTRY_SUFFIX}"
+        try:
+            snapshot = MPDSnapshot.from_buffer(path.read_bytes())
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError, struct.error):
+            logger.warning("Dropping unreadable cache entry %s", path)
+            path.unlink(missing_ok=True)
+        else:
+            self.hits += 1
+            with suppress(FileNotFoundError):
+                # evicted by another process since it was read
+                os.utime(path)
+            return snapshot
+
+        self.misses += 1
+        snapshot = MPDSnapshot.from_mpd(parse())
+        self._store(path, snapshot.to_bytes())
+        return snapshot
+
+    def _store(self, path: Path, data: bytes) -> None:
+        """write the entry atomically, then trim the directory to max_bytes"""
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as temporary_file:
+            try:
+                temporary_file.write(data)
+                temporary_file.close()
+                os.replace(temporary_file.name, path)
+            except BaseException:
+                # e.g. a full disk, do not leave the partial entry behind
+                Path(temporary_file.name).unlink(missing_ok=True)
+                raise
+        if self._directory_bytes is not None:
+            self._directory_bytes += len(data)
+        if self._directory_bytes is None or self._directory_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """scan the directory, remove the least recently used entries while it is over max_bytes"""
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            Path(entry_path).unlink(missing_ok=True)
+            total_bytes -= size
+        self._directory_bytes = total_bytes
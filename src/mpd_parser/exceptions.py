@@ -18,3 +18,7 @@ class UnknownElementTreeParseError(Exception):
 class NoPeriodAncestorForTargetElement(Exception):
     """ Raised when trying to create a timeline from template without parent period """
     description = "targeted segment template is not nested under a periods"
+
+class ManifestFetchError(Exception):
+    """ Raised when a manifest could not be downloaded, or the server answered with an error status """
+    description = "failed to fetch manifest over http"
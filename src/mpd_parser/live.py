@@ -0,0 +1,181 @@
+""" Keep dynamic manifests current by re-fetching them every minimumUpdatePeriod """
+import asyncio
+import inspect
+import logging
+import re
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+from urllib.parse import urljoin
+
+from mpd_parser.async_http import NOT_MODIFIED, AsyncHTTPClient, conditional_headers
+from mpd_parser.constants import DYNAMIC_TYPE, TWO_SECONDS
+from mpd_parser.exceptions import ManifestFetchError
+from mpd_parser.models.composite_tags import MPD
+from mpd_parser.parser import Parser
+from mpd_parser.parser_profiles import DEFAULT_PROFILE, ParserProfile
+
+# module level logger, application will configure formatting and handlers
+logger = logging.getLogger(__name__)
+
+# publishTime attribute of the root MPD tag, read from the raw payload before deciding to parse it
+PUBLISH_TIME_PATTERN = re.compile(rb"<(?:[\w.-]+:)?MPD\b[^>]*?\spublishTime\s*=\s*[\"']([^\"']*)[\"']")
+DEFAULT_MAX_CONCURRENT_FETCHES = 64
+
+
+def extract_publish_time(manifest_as_bytes: bytes) -> Optional[str]:
+    """MPD@publishTime read with a regex over the raw payload, None when it is not declared"""
+    match = PUBLISH_TIME_PATTERN.search(manifest_as_bytes)
+    return match.group(1).decode("utf-8") if match else None
+
+
+@dataclass
+class LiveManifest:  # pylint: disable=too-many-instance-attributes
+    """Refresh state of a single manifest"""
+
+    url: str  # url the manifest was added with
+    current_url: str  # url fetched next, follows MPD.Location
+    mpd: Optional[MPD] = None
+    publish_time: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetches: int = 0
+    parses: int = 0
+    task: Optional[asyncio.Task] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """request headers that let the server answer 304 when the manifest did not change"""
+        return conditional_headers(self.etag, self.last_modified)
+
+
+UpdateCallback = Callable[[LiveManifest], Union[None, Awaitable[None]]]
+
+
+class RefreshManager:  # pylint: disable=too-many-instance-attributes
+    """
+        Refreshes many live manifests concurrently on a single event loop.
+    Every manifest gets a lightweight task that sleeps for MPD@minimumUpdatePeriod between fetches.
+    Fetches share one pooled AsyncHTTPClient and a bound on concurrent requests.
+    A manifest is reparsed only when the server returns new content with a new publishTime.
+    Parsing runs in the executor, lxml releases the GIL meanwhile, so the loop keeps serving the other channels.
+    MPD.Location redirects the following fetches, and refreshing stops once the manifest is static.
+    Every refresh replaces manifest.mpd with a new MPD object by default.
+    With incremental=True the same MPD object is kept and updated in place, see MPD.update_from,
+    so unchanged Periods keep their Tag objects and cached values across refreshes. The update runs in the
+    executor too, do not read that MPD from other coroutines while it is refreshed, on_update is safe.
+
+    Example:
+        >>> async with RefreshManager(on_update=handle) as manager:
+        ...     manager.add("https://example.com/live.mpd")
+        ...     await asyncio.sleep(3600)
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        on_update: Optional[UpdateCallback] = None,
+        client: Optional[AsyncHTTPClient] = None,
+        profile: ParserProfile = DEFAULT_PROFILE,
+        max_concurrent_fetches: int = DEFAULT_MAX_CONCURRENT_FETCHES,
+        retry_interval: float = TWO_SECONDS,
+        incremental: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.on_update = on_update
+        self.client = client or AsyncHTTPClient()
+        self.profile = profile
+        self.retry_interval = retry_interval
+        self.incremental = incremental
+        # None runs the parses in the loop's default executor
+        self.executor = executor
+        self.manifests: Dict[str, LiveManifest] = {}
+        self._owns_client = client is None
+        self._fetch_limit = asyncio.Semaphore(max_concurrent_fetches)
+
+    async def __aenter__(self) -> "RefreshManager":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def add(self, url: str) -> LiveManifest:
+        """start refreshing a manifest, must be called from within the running event loop"""
+        manifest = self.manifests.get(url)
+        if manifest is None:
+            manifest = self.manifests[url] = LiveManifest(url=url, current_url=url)
+            manifest.task = asyncio.get_running_loop().create_task(self._refresh_loop(manifest))
+        return manifest
+
+    async def remove(self, url: str) -> None:
+        """stop refreshing a manifest"""
+        manifest = self.manifests.pop(url, None)
+        if manifest and manifest.task:
+            manifest.task.cancel()
+            await asyncio.gather(manifest.task, return_exceptions=True)
+
+    async def close(self) -> None:
+        """stop every refresh, and close the client when the manager created it"""
+        for url in list(self.manifests):
+            await self.remove(url)
+        if self._owns_client:
+            await self.client.close()
+
+    async def refresh(self, manifest: LiveManifest) -> bool:
+        """
+            Fetch a manifest once
+        Returns:
+            bool: True when a new version was parsed, False when it did not change
+        """
+        async with self._fetch_limit:
+            response = await self.client.get(manifest.current_url, headers=manifest.conditional_headers())
+        manifest.fetches += 1
+        if response.status == NOT_MODIFIED:
+            return False
+        if response.status != 200:
+            raise ManifestFetchError(f"GET {manifest.current_url} answered {response.status}")
+        manifest.etag = response.headers.get("etag")
+        manifest.last_modified = response.headers.get("last-modified")
+
+        publish_time = extract_publish_time(response.body)
+        if manifest.mpd is not None and publish_time is not None and publish_time == manifest.publish_time:
+            return False
+
+        loop = asyncio.get_running_loop()
+        mpd = await loop.run_in_executor(self.executor, self._parse, manifest, response.body)
+        manifest.parses += 1
+        manifest.mpd = mpd
+        manifest.publish_time = mpd.publish_time
+        if mpd.locations and mpd.locations[0].text:
+            location = urljoin(manifest.current_url, mpd.locations[0].text.strip())
+            if location != manifest.current_url:
+                # validators belong to the previous url
+                manifest.current_url = location
+                manifest.etag = manifest.last_modified = None
+        if self.on_update is not None:
+            result = self.on_update(manifest)
+            if inspect.isawaitable(result):
+                await result
+        return True
+
+    def _parse(self, manifest: LiveManifest, manifest_as_bytes: bytes) -> MPD:
+        """parse a new version of the manifest, merged into the current MPD with incremental updates"""
+        mpd = Parser.from_bytes(manifest_as_bytes, profile=self.profile)
+        if self.incremental and manifest.mpd is not None:
+            manifest.mpd.update_from(mpd)
+            return manifest.mpd
+        return mpd
+
+    async def _refresh_loop(self, manifest: LiveManifest) -> None:
+        """refresh a manifest until it is removed or stops being dynamic"""
+        while True:
+            try:
+                await self.refresh(manifest)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # keep the channel alive, the next attempt may succeed
+                logger.exception("Failed to refresh manifest %s", manifest.current_url)
+                await asyncio.sleep(self.retry_interval)
+                continue
+            if manifest.mpd.type != DYNAMIC_TYPE:
+                logger.info("Manifest %s is not dynamic, refresh stopped", manifest.current_url)
+                return
+            # a zero update period would turn into a busy loop against the origin
+            await asyncio.sleep(manifest.mpd.minimum_update_period_in_seconds or self.retry_interval)
@@ -0,0 +1,179 @@
+""" In-process cache of parsed manifests, for services parsing the same upstream manifests again and again """
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional
+
+from mpd_parser.constants import DYNAMIC_TYPE, TWO_SECONDS
+from mpd_parser.models.composite_tags import MPD
+from mpd_parser.models.interning import InternPool, intern_values
+from mpd_parser.parser import Parser
+from mpd_parser.parser_profiles import DEFAULT_PROFILE, ParserProfile
+
+DEFAULT_MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# rough footprint of a parsed element and of each of its attributes, lxml node plus Python proxies
+ESTIMATED_ELEMENT_BYTES = 200
+ESTIMATED_ATTRIBUTE_BYTES = 80
+
+
+def estimate_manifest_size(mpd: MPD) -> int:
+    """approximate memory held by a parsed manifest, a walk over its elements"""
+    return sum(
+        ESTIMATED_ELEMENT_BYTES + ESTIMATED_ATTRIBUTE_BYTES * len(element.attrib) + len(element.text or "")
+        for element in mpd.element.iter()
+    )
+
+
+@dataclass
+class _CacheEntry:
+    """a cached manifest with its weight and expiry, in clock seconds"""
+
+    mpd: MPD
+    size: int
+    expires_at: float
+
+
+@dataclass
+class _Flight:
+    """a load in progress, waited on by the requests that arrive meanwhile"""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    mpd: Optional[MPD] = None
+    error: Optional[Exception] = None
+
+
+class ParsedManifestCache:  # pylint: disable=too-many-instance-attributes
+    """
+        Thread safe LRU of parsed manifests, bounded by their estimated size in bytes.
+    Dynamic manifests expire after their MPD@minimumUpdatePeriod, static ones after static_ttl
+    (never by default). Concurrent requests for a missing key share a single fetch and parse.
+    Cached MPD objects are shared by every caller, treat them as read-only, see Tag.
+
+    Example:
+        >>> cache = ParsedManifestCache(max_bytes=64 * 1024 * 1024)
+        >>> mpd = cache.from_url("https://example.com/live.mpd")
+        >>> cache.hits, cache.misses
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        max_bytes: int = DEFAULT_MEMORY_CACHE_MAX_BYTES,
+        static_ttl: Optional[float] = None,
+        dynamic_ttl: float = TWO_SECONDS,
+        size_of: Callable[[MPD], int] = estimate_manifest_size,
+        clock: Callable[[], float] = time.monotonic,
+        intern_pool: Optional[InternPool] = None,
+    ) -> None:
+        """
+        Args:
+            max_bytes (int): bound on the summed size of the cached manifests
+            static_ttl (float): seconds a static manifest is kept, None to keep it until evicted
+            dynamic_ttl (float): seconds a dynamic manifest without minimumUpdatePeriod is kept
+            size_of (callable): weight of a manifest in bytes
+            clock (callable): monotonic time source, in seconds
+            intern_pool (InternPool): share repeated values of the cached manifests, see intern_values
+        """
+        self.max_bytes = max_bytes
+        self.static_ttl = static_ttl
+        self.dynamic_ttl = dynamic_ttl
+        self.size_of = size_of
+        self.clock = clock
+        self.intern_pool = intern_pool
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # requests that waited for another request's load
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def from_url(self, url: str, profile: ParserProfile = DEFAULT_PROFILE) -> MPD:
+        """cached Parser.from_url"""
+        return self.get(("url", url, profile), lambda: Parser.from_url(url, profile=profile))
+
+    def from_file(self, manifest_file_name: str, profile: ParserProfile = DEFAULT_PROFILE) -> MPD:
+        """cached Parser.from_file"""
+        return self.get(("file", manifest_file_name, profile), lambda: Parser.from_file(manifest_file_name, profile))
+
+    def get(self, key: Hashable, loader: Callable[[], MPD]) -> MPD:
+        """
+            The cached manifest of the key, loaded with loader when it is missing or expired
+        Errors of the loader are raised to every request waiting for it, and nothing is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.mpd
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.mpd
+
+        try:
+            flight.mpd = loader()
+            if self.intern_pool is not None:
+                intern_values(flight.mpd, self.intern_pool)
+        except Exception as err:
+            flight.error = err
+            raise
+        else:
+            self._store(key, flight.mpd)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.mpd
+
+    def invalidate(self, key: Hashable) -> None:
+        """drop a single entry"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry.size
+
+    def clear(self) -> None:
+        """drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _ttl(self, mpd: MPD) -> float:
+        """seconds until a newer version of the manifest may exist"""
+        if mpd.type == DYNAMIC_TYPE:
+            return mpd.minimum_update_period_in_seconds if mpd.minimum_update_period else self.dynamic_ttl
+        return math.inf if self.static_ttl is None else self.static_ttl
+
+    def _store(self, key: Hashable, mpd: MPD) -> None:
+        """insert a loaded manifest, evicting the least recently used ones over max_bytes"""
+        size = self.size_of(mpd)
+        expires_at = self.clock() + self._ttl(mpd)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.size
+            if size > self.max_bytes:
+                # would evict everything else and still not fit
+                return
+            self._entries[key] = _CacheEntry(mpd=mpd, size=size, expires_at=expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.size
+                self.evictions += 1
@@ -1,19 +1,81 @@
 # pylint: disable=missing-function-docstring
 """ Module for the base class for tags, and other simple tags """
-from functools import cached_property
-from typing import Any, Optional
+from functools import cached_property, partial
+from typing import Any, Callable, Dict, List, Optional
 from xml.etree.ElementTree import Element
 
 from mpd_parser.attribute_parsers import get_bool_value, get_float_value, get_int_value, get_list_of_type
-from mpd_parser.constants import KEYS_NOT_FOR_SETTING, LOOKUP_STR_FORMAT
+from mpd_parser.constants import KEYS_NOT_FOR_SETTING
+from mpd_parser.models.fields import Attr, Children, Field, Text, collect_fields, to_camel_case
 
 
-class Tag:
-    """Generic repr of mpd tag object"""
+class DerivedProperty(property):
+    """
+        Read-only property computed from other attributes of the tag.
+    The value is cached in the instance's own derived cache, created on the first derived value
+    and cleared whenever the tag writes to its element. That keeps the value truthful after assignments,
+    and unlike lru_cache on a method, it is released together with the instance. As a property subclass,
+    linters and introspection treat it like any other property.
+    """
+
+    def __init__(self, func: Callable[[Any], Any]) -> None:
+        super().__init__(func, doc=func.__doc__)
+        self.func = func
+        self.name = func.__name__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        cache = instance._derived_cache  # pylint: disable=protected-access
+        if cache is None:
+            cache = instance._derived_cache = {}  # pylint: disable=protected-access
+        if self.name not in cache:
+            cache[self.name] = self.func(instance)
+        return cache[self.name]
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        raise AttributeError(f"'{self.name}' is derived and cannot be assigned")
+
+
+# decorator for tag values derived from other attributes, the class itself so linters see a property
+derived_property = DerivedProperty  # pylint: disable=invalid-name
+
+
+class TagBase:
+    """
+        Root of the tag classes, holds the element, the field tables and the write path.
+    It has no instance dictionary, so a subclass that declares __slots__ has none either,
+    see SlottedTag. Tag adds the dictionary that caches the values of ordinary tags.
+    """
+
+    __slots__ = ("element", "_derived_cache")
+
+    tag_fields: Dict[str, Field] = {}
+    attribute_names: Dict[str, str] = {}
+    tag_map: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._set_fields(collect_fields(cls))
+
+    @classmethod
+    def _set_fields(cls, tag_fields: Dict[str, Field]) -> None:
+        """fill the field tables of the class, see Tag"""
+        cls.tag_fields = tag_fields
+        cls.attribute_names = {
+            name: field.xml_name for name, field in tag_fields.items() if isinstance(field, Attr)
+        }
+        cls.tag_map = {
+            name: xml_name for name, xml_name in cls.attribute_names.items() if xml_name != to_camel_case(name)
+        }
 
     def __init__(self, element: Element) -> None:
         self.element: Element = element
-        self.tag_map: dict = {}
+        # created by the first derived_property read, most tags never have one
+        self._derived_cache: Optional[Dict[str, Any]] = None
 
     def __setattr__(self, key: str, value: Any) -> None:
         """overload default setattr to make changes to the lxml element when attributes are changed by user"""
@@ -22,17 +84,40 @@ class Tag:
         if key in KEYS_NOT_FOR_SETTING:
             return
 
+        # the element is about to change, derived values must be computed again
+        if self._derived_cache:
+            self._derived_cache.clear()
+        self._write_attribute(key, value)
+
+    def update(self, **attributes: Any) -> None:
+        """
+            Assign many attributes at once, same as assigning them one by one.
+        The derived cache is cleared once for the whole batch instead of once per assignment.
+
+        Example:
+            >>> template.update(media="ad-$Number$.mp4", presentation_time_offset=0)
+        """
+        try:
+            for key, value in attributes.items():
+                # same checks as a plain assignment, e.g. derived properties refuse writes
+                object.__setattr__(self, key, value)
+                if key not in KEYS_NOT_FOR_SETTING:
+                    self._write_attribute(key, value)
+        finally:
+            # also after a refused write, the ones before it did change the element
+            if self._derived_cache:
+                self._derived_cache.clear()
+
+    def _write_attribute(self, key: str, value: Any) -> None:
+        """write an assigned value back to the element"""
         # not an attribute, but part of the element
         if key == "text":
             self.element.text = value
             return
 
-        # most attributes have a camel case name in DASH
-        element_attrib_name = self.to_camel_case(key)
-
-        # and those that don't, are mapped in tag_map
-        if self.tag_map and key in self.tag_map:
-            element_attrib_name = self.tag_map.get(key, element_attrib_name)
+        # a tag_map set on the instance overrides the names declared by the class,
+        # other attributes have a camel case name in DASH
+        element_attrib_name = self.tag_map.get(key) or self.attribute_names.get(key) or to_camel_case(key)
 
         # the value is None, remove attribute
         if not value:
@@ -41,24 +126,95 @@ class Tag:
 
         # list value should turn to a comma separated string
         if isinstance(value, list):
-            self.element.attrib[element_attrib_name] = ",".join(map(str, value))
+            self.element.set(element_attrib_name, ",".join(map(str, value)))
             return
 
-        self.element.attrib[element_attrib_name] = str(value)
+        # set skips the attrib proxy that element.attrib creates on every access
+        self.element.set(element_attrib_name, str(value))
 
     @classmethod
     def to_camel_case(cls, snake_case_string: str) -> str:
         """convert snake_case to lowerCamelCase"""
-        lead, *follow = snake_case_string.split("_")
-        return "".join([lead, *map(str.capitalize, follow)])
+        return to_camel_case(snake_case_string)
+
+
+class Tag(TagBase):
+    """
+        Generic repr of mpd tag object
+
+    Thread safety:
+    - Reading a tag tree from many threads is safe. Values are computed on first access and
+      cached on the instance (cached_property, derived_property). Two threads may compute the
+      same value at once and the last write wins: scalar values are equal, but child tag lists
+      may briefly exist twice, so do not rely on their identity across threads.
+      There are no shared lru_cache tables, a tag's caches live and die with the instance.
+    - Assigning attributes is not safe while other threads use the same tree. __setattr__
+      writes to the shared lxml element and clears the derived cache, and lxml does not
+      support concurrent modification of a tree. The same holds for MPD.update_from.
+      Give each writer its own tree (parse again), or guard the tree with a lock.
+    - Parsing is safe from any thread, every thread gets its own lxml parser.
+
+    Values read from the element are declared as fields (Attr, Text, Children, Child).
+    Every subclass collects its fields once, when it is created, into:
+    - tag_fields: the fields by name
+    - attribute_names: field name to xml attribute name, used to write assignments back
+    - tag_map: the attribute names that are not the camel case of their field name
+    """
+
+    @cached_property
+    def child_index(self) -> Dict[str, List[Element]]:
+        """direct child elements bucketed by local name, built in a single pass over the element"""
+        index: Dict[str, List[Element]] = {}
+        for child in self.element:
+            # comments and processing instructions have a factory function as tag
+            if not isinstance(child.tag, str):
+                continue
+            index.setdefault(child.tag.rpartition("}")[2], []).append(child)
+        return index
+
+    def child_elements(self, target: str) -> List[Element]:
+        """direct child elements with the given local name, ignoring namespaces"""
+        return self.child_index.get(target, [])
+
+
+class SlottedTag(TagBase):
+    """
+        Tag without an instance dictionary, for leaf elements that come by the thousands (S, SegmentURL).
+    A subclass mirrors the Attr and Text fields of a Tag class, given as fields_of, and declares
+    __slots__ named after them. Each value is computed on its first read and cached in its slot.
+    Assignments are written back to the element like on any tag, but only fields can be assigned.
+
+    Example:
+        >>> class CompactSegment(SlottedTag, fields_of=Segment):
+        ...     __slots__ = ("t", "d", "r")
+    """
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, fields_of: Optional[type] = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if fields_of is None:
+            return
+        missing = set(fields_of.tag_fields) - set(cls.__slots__)
+        if missing:
+            raise TypeError(f"{cls.__name__} is missing __slots__ for the fields {sorted(missing)}")
+        cls._set_fields(fields_of.tag_fields)
+
+    def __getattr__(self, name: str) -> Any:
+        """computes a field on its first read, only called while its slot is still empty"""
+        field = self.tag_fields.get(name)
+        if field is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        value = field.compute(self)
+        # the value came from the element, no need to write it back
+        object.__setattr__(self, name, value)
+        return value
 
 
 class TextTag(Tag):
     """A tag that uses the text member frequently"""
 
-    @cached_property
-    def text(self) -> str:
-        return self.element.text
+    text = Text()
 
 
 class PSSH(Tag):
@@ -72,37 +228,12 @@ class PSSH(Tag):
 class ContentProtection(Tag):
     """Tag for content protection"""
 
-    def __init__(self, element):
-        super().__init__(element)
-        self.tag_map = {
-            "default_key_id": "default_KId",
-            "ns2_key_id": "ns2:default_KID",
-            "cenc_default_kid": "cenc:default_KID",
-        }
-
-    @cached_property
-    def scheme_id_uri(self):
-        return self.element.attrib.get("schemeIdUri")
-
-    @cached_property
-    def value(self):
-        return self.element.attrib.get("value")
-
-    @cached_property
-    def id(self):
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def default_key_id(self):
-        return self.element.attrib.get("default_KId")
-
-    @cached_property
-    def ns2_key_id(self):
-        return self.element.attrib.get("ns2:default_KID")
-
-    @cached_property
-    def cenc_default_kid(self):
-        return self.element.attrib.get("cenc:default_KID")
+    scheme_id_uri = Attr()
+    value = Attr()
+    id = Attr()
+    default_key_id = Attr("default_KId")
+    ns2_key_id = Attr("ns2:default_KID")
+    cenc_default_kid = Attr("cenc:default_KID")
 
     @cached_property
     def pssh(self):
@@ -112,17 +243,9 @@ class ContentProtection(Tag):
 class Descriptor(Tag):
     """Reusable class for tag that have url, id and a value"""
 
-    @cached_property
-    def scheme_id_uri(self) -> str:
-        return self.element.attrib.get("schemeIdUri")
-
-    @cached_property
-    def id(self) -> str:
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def value(self) -> str:
-        return self.element.attrib.get("value")
+    scheme_id_uri = Attr()
+    id = Attr()
+    value = Attr()
 
 
 class UTCTiming(Descriptor):
@@ -136,53 +259,14 @@ class AssetIdentifiers(Descriptor):
 class ContentComponent(Tag):
     """Content Compoenet tag representation"""
 
-    @cached_property
-    def id(self):
-        return get_int_value(self.element.attrib.get("id"))
-
-    @cached_property
-    def lang(self):
-        return self.element.attrib.get("lang")
-
-    @cached_property
-    def content_type(self):
-        return self.element.attrib.get("contentType")
-
-    @cached_property
-    def par(self):
-        return self.element.attrib.get("par")
-
-    @cached_property
-    def accessibilities(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Accessibility")
-            )
-        ]
-
-    @cached_property
-    def roles(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Role"))
-        ]
-
-    @cached_property
-    def ratings(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Rating"))
-        ]
-
-    @cached_property
-    def viewpoints(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Viewpoint")
-            )
-        ]
+    id = Attr(converter=get_int_value)
+    lang = Attr()
+    content_type = Attr()
+    par = Attr()
+    accessibilities = Children("Accessibility", Descriptor)
+    roles = Children("Role", Descriptor)
+    ratings = Children("Rating", Descriptor)
+    viewpoints = Children("Viewpoint", Descriptor)
 
 
 class Title(TextTag):
@@ -204,124 +288,48 @@ class Copyright(TextTag):
 class ProgramInfo(Tag):
     """Program information tag representation"""
 
-    def __init__(self, element):
-        super().__init__(element)
-        self.tag_map = {"more_info_url": "moreInformationURL"}
-
-    @cached_property
-    def lang(self):
-        return self.element.attrib.get("lang")
-
-    @cached_property
-    def more_info_url(self):
-        return self.element.attrib.get("moreInformationURL")
-
-    @cached_property
-    def titles(self):
-        return [
-            Title(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Title"))
-        ]
-
-    @cached_property
-    def sources(self):
-        return [
-            Source(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Source"))
-        ]
-
-    @cached_property
-    def copy_rights(self):
-        return [
-            Copyright(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Copyright")
-            )
-        ]
+    lang = Attr()
+    more_info_url = Attr("moreInformationURL")
+    titles = Children("Title", Title)
+    sources = Children("Source", Source)
+    copy_rights = Children("Copyright", Copyright)
 
 
 class BaseURL(Tag):
     """Base URL tag representation"""
 
-    @cached_property
-    def text(self) -> str:
-        return self.element.text
-
-    @cached_property
-    def service_location(self) -> str:
-        return self.element.attrib.get("serviceLocation")
-
-    @cached_property
-    def byte_range(self) -> str:
-        return self.element.attrib.get("byteRange")
-
-    @cached_property
-    def availability_time_offset(self) -> float:
-        return get_float_value(self.element.attrib.get("availabilityTimeOffset"))
-
-    @cached_property
-    def availability_time_complete(self) -> Optional[bool]:
-        return get_bool_value(self.element.attrib.get("availabilityTimeComplete"))
+    text = Text()
+    service_location = Attr()
+    byte_range = Attr()
+    availability_time_offset = Attr(converter=get_float_value)
+    availability_time_complete = Attr(converter=get_bool_value)
 
 
 class URL(Tag):
     """Represent tags that have source-url and range attributes"""
 
-    def __init__(self, element):
-        super().__init__(element)
-        self.tag_map = {"source_url": "sourceURL"}
-
-    @cached_property
-    def source_url(self):
-        return self.element.attrib.get("sourceURL")
-
-    @cached_property
-    def range(self):
-        return self.element.attrib.get("range")
+    source_url = Attr("sourceURL")
+    range = Attr()
 
 
 class Event(TextTag):
     """Single event tag"""
 
-    @cached_property
-    def message_data(self):
-        return self.element.attrib.get("messageData")
-
-    @cached_property
-    def presentation_time(self):
-        return int(self.element.attrib.get("presentationTime"))
-
-    @cached_property
-    def duration(self):
-        return int(self.element.attrib.get("duration"))
-
-    @cached_property
-    def id(self):
-        return int(self.element.attrib.get("id"))
+    message_data = Attr()
+    presentation_time = Attr(converter=int)
+    duration = Attr(converter=int)
+    id = Attr(converter=int)
 
 
 class EventStream(Descriptor):
     """Event Stream tag"""
 
-    @cached_property
-    def timescale(self):
-        return self.element.attrib.get("timescale")
-
-    @cached_property
-    def events(self):
-        return [
-            Event(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Event"))
-        ]
+    timescale = Attr()
+    events = Children("Event", Event)
 
 
 class Subset(Tag):
     """Subset tag"""
 
-    @cached_property
-    def id(self):
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def contains(self):
-        return get_list_of_type(int, self.element.attrib.get("contains"))
+    id = Attr()
+    contains = Attr(converter=partial(get_list_of_type, int))
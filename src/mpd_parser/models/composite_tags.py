@@ -1,6 +1,10 @@
 # pylint: disable=missing-function-docstring
 """ Module for the compelex tags such as MPD, Period and others """
-from functools import cached_property, lru_cache
+import itertools
+from bisect import bisect_right
+from functools import cached_property, partial
+from math import floor, isnan
+from typing import Iterator, Optional, Tuple
 from xml.etree.ElementTree import Element
 
 from isodate import parse_datetime, parse_duration
@@ -13,9 +17,7 @@ from mpd_parser.attribute_parsers import (
     organize_ns,
 )
 from mpd_parser.constants import (
-    ANCESTOR_LOOKUP_STR_FORMAT,
-    DERIVED_ATTRIBUTES_CACHE_SIZE,
-    LOOKUP_STR_FORMAT,
+    ANCESTOR_AXIS,
     TWO_SECONDS,
     ZERO_SECONDS,
 )
@@ -31,35 +33,31 @@ from mpd_parser.models.base_tags import (
     Subset,
     Tag,
     UTCTiming,
+    derived_property,
 )
+from mpd_parser.models.fields import Attr, Child, Children
+from mpd_parser.models.merge import update_tag
 from mpd_parser.models.segment_tags import MultipleSegmentBase, SegmentBase, SegmentList
-from mpd_parser.timeline_utils import SegmentTiming
+from mpd_parser.timeline_utils import SegmentTiming, SegmentTimingTable, TimelineRun, iter_timeline_runs
+from mpd_parser.xpath_lookups import lookup_xpath
 
 
 class Period(Tag):
     """Period class, represents a period tag in mpd manifest."""
 
-    @cached_property
-    def id(self):
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def start(self):
-        return self.element.attrib.get("start")
+    id = Attr()
+    start = Attr()
 
-    @property
-    @lru_cache(maxsize=DERIVED_ATTRIBUTES_CACHE_SIZE)
+    @derived_property
     def start_in_seconds(self) -> float:
         """Parsed and converted to seconds,
-        Does not uses cached_property to block writes as it must be derived to maintain truthness
+        Does not use cached_property to block writes as it must be derived to maintain truthness
         """
         return (
             parse_duration(self.start).total_seconds() if self.start else ZERO_SECONDS
         )
 
-    @cached_property
-    def duration(self):
-        return self.element.attrib.get("duration")
+    duration = Attr()
 
     @property
     def duration_in_seconds(self) -> float:
@@ -70,73 +68,15 @@ class Period(Tag):
             else ZERO_SECONDS
         )
 
-    @cached_property
-    def bitstream_switching(self):
-        return get_bool_value(self.element.attrib.get("bitstreamSwitching"))
-
-    @cached_property
-    def base_urls(self):
-        return [
-            BaseURL(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="BaseURL"))
-        ]
-
-    @cached_property
-    def segment_bases(self):
-        return [
-            SegmentBase(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentBase")
-            )
-        ]
-
-    @cached_property
-    def segment_lists(self):
-        return [
-            SegmentList(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentList")
-            )
-        ]
-
-    @cached_property
-    def segment_template(self):
-        elements = self.element.xpath(LOOKUP_STR_FORMAT.format(target="SegmentTemplate"))
-        return SegmentTemplate(elements[0]) if elements else None
-
-    @cached_property
-    def asset_identifiers(self):
-        return [
-            AssetIdentifiers(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="AssetIdentifiers")
-            )
-        ]
-
-    @cached_property
-    def event_streams(self):
-        return [
-            EventStream(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="EventStream")
-            )
-        ]
-
-    @cached_property
-    def adaptation_sets(self):
-        return [
-            AdaptationSet(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="AdaptationSet")
-            )
-        ]
-
-    @cached_property
-    def subsets(self):
-        return [
-            Subset(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Subset"))
-        ]
+    bitstream_switching = Attr(converter=get_bool_value)
+    base_urls = Children("BaseURL", BaseURL)
+    segment_bases = Children("SegmentBase", SegmentBase)
+    segment_lists = Children("SegmentList", SegmentList)
+    segment_template = Child("SegmentTemplate", "SegmentTemplate")
+    asset_identifiers = Children("AssetIdentifiers", AssetIdentifiers)
+    event_streams = Children("EventStream", EventStream)
+    adaptation_sets = Children("AdaptationSet", "AdaptationSet")
+    subsets = Children("Subset", Subset)
 
 
 class MPD(Tag):  # pylint: disable=too-many-public-methods
@@ -150,7 +90,19 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
     def __init__(self, element: Element, encoding: str = "utf-8"):
         super().__init__(element=element)
         self.encoding = encoding
-        self.tag_map = {"cenc": "xlmns:cenc"}
+
+    def update_from(self, new_manifest: "MPD") -> bool:
+        """
+            Update this manifest in place from a newer version of it, e.g. the next live refresh.
+        Periods, AdaptationSets and Representations are matched by @id and keep their Tag objects,
+        which move to the elements of new_manifest. Segment tags of a SegmentTimeline are kept for the entries
+        still in the window. Only the values that were read are visited, the rest of the tree is compared in C.
+        new_manifest is consumed by the update and should not be used afterwards.
+
+        Returns:
+            bool: True when anything changed
+        """
+        return update_tag(self, new_manifest.element)
 
     @cached_property
     def namespace(self):
@@ -164,28 +116,13 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
     def xmlns(self):
         return self.element.nsmap.get(None)
 
-    @cached_property
-    def id(self):
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def type(self):
-        return self.element.attrib.get("type")
-
-    @cached_property
-    def profiles(self):
-        return self.element.attrib.get("profiles")
-
-    @cached_property
-    def cenc(self):
-        return self.element.attrib.get("xlmns:cenc")
-
-    @cached_property
-    def availability_start_time(self):
-        return self.element.attrib.get("availabilityStartTime")
+    id = Attr()
+    type = Attr()
+    profiles = Attr()
+    cenc = Attr("xlmns:cenc")
+    availability_start_time = Attr()
 
-    @property
-    @lru_cache
+    @derived_property
     def availability_start_time_in_seconds(self):
         return (
             (
@@ -196,12 +133,9 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
             else None
         )
 
-    @cached_property
-    def availability_end_time(self):
-        return self.element.attrib.get("availabilityEndTime")
+    availability_end_time = Attr()
 
-    @property
-    @lru_cache
+    @derived_property
     def availability_end_time_in_seconds(self):
         return (
             parse_duration(self.availability_end_time).total_seconds()
@@ -209,20 +143,11 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
             else None
         )
 
-    @cached_property
-    def publish_time(self):
-        return self.element.attrib.get("publishTime")
-
-    @cached_property
-    def media_presentation_duration(self):
-        return self.element.attrib.get("mediaPresentationDuration")
+    publish_time = Attr()
+    media_presentation_duration = Attr()
+    minimum_update_period = Attr()
 
-    @cached_property
-    def minimum_update_period(self):
-        return self.element.attrib.get("minimumUpdatePeriod")
-
-    @property
-    @lru_cache
+    @derived_property
     def minimum_update_period_in_seconds(self):
         return (
             parse_duration(self.minimum_update_period).total_seconds()
@@ -230,16 +155,10 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
             else TWO_SECONDS  # default for minimumUpdatePeriod
         )
 
-    @cached_property
-    def min_buffer_time(self):
-        return self.element.attrib.get("minBufferTime")
-
-    @cached_property
-    def time_shift_buffer_depth(self):
-        return self.element.attrib.get("timeShiftBufferDepth")
+    min_buffer_time = Attr()
+    time_shift_buffer_depth = Attr()
 
-    @property
-    @lru_cache
+    @derived_property
     def time_shift_buffer_depth_in_seconds(self):
         return (
             parse_duration(self.time_shift_buffer_depth).total_seconds()
@@ -247,529 +166,311 @@ class MPD(Tag):  # pylint: disable=too-many-public-methods
             else ZERO_SECONDS
         )
 
-    @cached_property
-    def suggested_presentation_delay(self):
-        return self.element.attrib.get("suggestedPresentationDelay")
-
-    @cached_property
-    def max_segment_duration(self):
-        return self.element.attrib.get("maxSegmentDuration")
-
-    @cached_property
-    def max_subsegment_duration(self):
-        return self.element.attrib.get("maxSubsegmentDuration")
-
-    @cached_property
-    def program_informations(self):
-        return [
-            ProgramInfo(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="ProgramInformation")
-            )
-        ]
-
-    @cached_property
-    def base_urls(self):
-        return [
-            BaseURL(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="BaseURL"))
-        ]
-
-    @cached_property
-    def locations(self):
-        return [
-            Location(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Location")
-            )
-        ]
-
-    @cached_property
-    def utc_timings(self):
-        return [
-            UTCTiming(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="UTCTiming")
-            )
-        ]
-
-    @cached_property
-    def periods(self):
-        return [
-            Period(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Period"))
-        ]
+    suggested_presentation_delay = Attr()
+    max_segment_duration = Attr()
+    max_subsegment_duration = Attr()
+    program_informations = Children("ProgramInformation", ProgramInfo)
+    base_urls = Children("BaseURL", BaseURL)
+    locations = Children("Location", Location)
+    utc_timings = Children("UTCTiming", UTCTiming)
+    periods = Children("Period", Period)
 
 
 class SegmentTemplate(MultipleSegmentBase):
     """SegmentTemplate tag"""
 
-    @cached_property
-    def media(self):
-        return self.element.attrib.get("media")
-
-    @cached_property
-    def index(self):
-        return self.element.attrib.get("index")
-
-    @cached_property
-    def initialization(self):
-        return self.element.attrib.get("initialization")
-
-    @cached_property
-    def bitstream_switching(self):
-        return self.element.attrib.get("bitstreamSwitching")
+    media = Attr()
+    index = Attr()
+    initialization = Attr()
+    bitstream_switching = Attr()
 
-    @property
-    @lru_cache(maxsize=DERIVED_ATTRIBUTES_CACHE_SIZE)
+    @derived_property
     def parsed_segment_timeline(self):
         """Calculate timing information for segments based on SegmentTemplate
 
+        Uses the explicit SegmentTimeline when the template has one,
+        otherwise the fixed @duration of the template.
+
         Returns:
             List[SegmentTiming]: List of segment timing information.
-            if there's no duration and timescale in the template, returns empty list [].
+            if there's no timeline and no duration and timescale in the template, returns empty list [].
 
         Example:
             >>> template.duration = 2000
             >>> template.timescale = 1000
             >>> template.start_number = 1
-            >>> timings = TimelineUtils.get_segment_timing(template, 0)
+            >>> timings = template.parsed_segment_timeline
             >>> print(timings[0].duration)  # 2.0
             >>> print(timings[0].start_time)  # 0.0
         """
-        segments = []
-        if not self.duration or not self.timescale:
-            return segments
+        return list(self.iter_segment_timings())
 
-        # Get segment duration in seconds
-        segment_duration = self.duration / self.timescale
+    @derived_property
+    def segment_timing_table(self) -> SegmentTimingTable:
+        """Same timings as parsed_segment_timeline, stored column by column in typed arrays"""
+        return SegmentTimingTable.from_timings(self.iter_segment_timings())
 
-        # Get relevant variables
-        start_number = self.start_number or 1
-        period_ancestor = None
-        manifest_mpd = None
-        try:
-            period_ancestor = Period(
-                self.element.xpath(ANCESTOR_LOOKUP_STR_FORMAT.format(target="Period"))[
-                    0
-                ]
-            )
-        except IndexError:
-            pass
+    def segment_at_time(self, presentation_time: float) -> Optional[SegmentTiming]:
+        """Segment covering the given presentation time, in the same scale as SegmentTiming.start_time
+
+        Computed arithmetically for @duration templates, bounded only by the period duration,
+        binary search over the cached segment_timing_table, O(log n), for an explicit SegmentTimeline.
+
+        Returns:
+            SegmentTiming: the covering segment, None when the time falls outside the timeline or in a gap
+        """
+        if self.segment_timeline is None:
+            return self._duration_segment_at(presentation_time)
+        table = self.segment_timing_table
+        index = bisect_right(table.start_time, presentation_time) - 1
+        if index < 0 or presentation_time >= table.start_time[index] + table.duration[index]:
+            return None
+        return table[index]
+
+    def segment_available_at(self, wallclock: float) -> Optional[SegmentTiming]:
+        """Segment whose availability window contains the given wall-clock time, in seconds since the epoch
+
+        Computed arithmetically for @duration templates, so the current time is found past the time shift buffer,
+        binary search over the cached segment_timing_table, O(log n), for an explicit SegmentTimeline.
+
+        Returns:
+            SegmentTiming: the available segment, None when no segment is available at that time
+            or the MPD has no availabilityStartTime
+        """
+        if self.segment_timeline is None:
+            availability_start_time = self._duration_origin[2]
+            if availability_start_time is None:
+                return None
+            return self._duration_segment_at(wallclock - availability_start_time)
+        table = self.segment_timing_table
+        if not table or isnan(table.availability_start[0]):
+            return None
+        index = bisect_right(table.availability_start, wallclock) - 1
+        if index < 0 or wallclock >= table.availability_end[index]:
+            return None
+        return table[index]
+
+    @derived_property
+    def _duration_origin(self) -> Tuple[float, Optional[int], Optional[float]]:
+        """period start, number of segments the period holds (None without a period duration)
+        and availabilityStartTime (None without one), plain numbers for the @duration lookups"""
+        period_ancestor, manifest_mpd = self._timing_context()
+        period_start = period_ancestor.start_in_seconds if period_ancestor else ZERO_SECONDS
+        segment_count = None
+        if period_ancestor and period_ancestor.duration_in_seconds and self.duration and self.timescale:
+            segment_count = self._duration_segment_count(period_ancestor, manifest_mpd)
+        availability_start_time = None
+        if manifest_mpd and manifest_mpd.availability_start_time:
+            availability_start_time = manifest_mpd.availability_start_time_in_seconds
+        return period_start, segment_count, availability_start_time
+
+    def _duration_segment_at(self, presentation_time: float) -> Optional[SegmentTiming]:
+        """@duration segment covering the presentation time, startNumber + floor(elapsed * timescale / duration)"""
+        if not (self.duration and self.timescale):
+            return None
+        period_start, segment_count, availability_start_time = self._duration_origin
+        index = floor((presentation_time - period_start) * self.timescale / self.duration)
+        if index < 0 or (segment_count is not None and index >= segment_count):
+            return None
+        segment = SegmentTiming(
+            start_time=period_start + index * self.duration / self.timescale,
+            duration=self.duration / self.timescale,
+            number=(self.start_number or 1) + index,
+        )
+        if availability_start_time is not None:
+            segment.availability_start = availability_start_time + segment.start_time
+            segment.availability_end = segment.availability_start + segment.duration
+        return segment
+
+    def iter_segment_timings(  # pylint: disable=too-many-locals,too-many-branches
+        self,
+        start_time: Optional[float] = None,
+        start_number: Optional[int] = None,
+        count: Optional[int] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[SegmentTiming]:
+        """Lazily yield the timing information of the template's segments
+
+        Segments before the requested start are skipped arithmetically, per run of
+        equal segments, so starting near the live edge does not walk the whole buffer.
+
+        Args:
+            start_time: first yielded segment is the one covering this time, same scale as SegmentTiming.start_time
+            start_number: first yielded segment is the one with this number (or the first after it).
+                With either start, a @duration template in a period without @duration yields segments
+                without end, bound them with count or until.
+            count: stop after yielding this many segments
+            until: stop before the first segment that becomes available after this wall-clock time,
+                in seconds since the epoch. Ignored when the MPD has no availabilityStartTime.
 
-        try:
-            manifest_mpd = MPD(
-                self.element.xpath(ANCESTOR_LOOKUP_STR_FORMAT.format(target="MPD"))[0]
+        Returns:
+            Iterator[SegmentTiming]: timing information, in segment order
+        """
+        period_ancestor, manifest_mpd = self._timing_context()
+        period_start = period_ancestor.start_in_seconds if period_ancestor else ZERO_SECONDS
+        availability_start_time = None
+        if manifest_mpd and manifest_mpd.availability_start_time:
+            availability_start_time = manifest_mpd.availability_start_time_in_seconds
+
+        if self.segment_timeline is not None:
+            timescale = self.timescale or 1
+            presentation_time_offset = self.presentation_time_offset or 0
+            # a trailing r=-1 repeats until the end of the period
+            timeline_end = None
+            if period_ancestor and period_ancestor.duration_in_seconds:
+                timeline_end = presentation_time_offset + int(period_ancestor.duration_in_seconds * timescale)
+            runs = iter_timeline_runs(
+                self.segment_timeline.iter_entries(), start_number=self.start_number or 1, end=timeline_end
             )
-        except IndexError:
-            pass
+        elif self.duration and self.timescale:
+            timescale = self.timescale
+            presentation_time_offset = 0
+            segment_count: Optional[int] = self._duration_segment_count(period_ancestor, manifest_mpd)
+            if (start_time is not None or start_number is not None) and not (
+                period_ancestor and period_ancestor.duration_in_seconds
+            ):
+                # a live template has no last segment, count and until end the iteration
+                segment_count = None
+            runs = [TimelineRun(t=0, d=self.duration, number=self.start_number or 1, count=segment_count)]
+        else:
+            return
+
+        remaining = count
+        for run in runs:
+            first = 0
+            if start_number is not None:
+                first = max(first, start_number - run.number)
+            if start_time is not None:
+                media_time = (start_time - period_start) * timescale + presentation_time_offset
+                first = max(first, int((media_time - run.t) // run.d))
+            for index in range(first, run.count) if run.count is not None else itertools.count(first):
+                if remaining is not None and remaining <= 0:
+                    return
+                segment = SegmentTiming(
+                    start_time=period_start + (run.t + index * run.d - presentation_time_offset) / timescale,
+                    duration=run.d / timescale,
+                    number=run.number + index,
+                )
+                if availability_start_time is not None:
+                    segment.availability_start = availability_start_time + segment.start_time
+                    segment.availability_end = segment.availability_start + segment.duration
+                    if until is not None and segment.availability_start > until:
+                        return
+                yield segment
+                if remaining is not None:
+                    remaining -= 1
+
+    def _timing_context(self) -> Tuple[Optional[Period], Optional[MPD]]:
+        """closest Period and MPD ancestors of the template, None when there is no such ancestor"""
+        periods = lookup_xpath("Period", ANCESTOR_AXIS)(self.element)
+        manifests = lookup_xpath("MPD", ANCESTOR_AXIS)(self.element)
+        return (
+            Period(periods[0]) if periods else None,
+            MPD(manifests[0]) if manifests else None,
+        )
+
+    def _duration_segment_count(self, period_ancestor: Optional[Period], manifest_mpd: Optional[MPD]) -> int:
+        """number of @duration based segments, bounded by the period, time shift buffer or update period"""
+        # Get segment duration in seconds
+        segment_duration = self.duration / self.timescale
 
         # Calculate segment count based on context
         if period_ancestor and period_ancestor.duration_in_seconds:
             # VOD content - use period duration
-            segment_count = int(period_ancestor.duration_in_seconds / segment_duration)
-        elif (
+            return int(period_ancestor.duration_in_seconds / segment_duration)
+        if (
             manifest_mpd
             and manifest_mpd.availability_start_time
             and manifest_mpd.time_shift_buffer_depth
         ):
             # Live content - use time shift buffer if available
             time_shift_buffer = manifest_mpd.time_shift_buffer_depth_in_seconds
-            segment_count = int(time_shift_buffer / segment_duration)
-        else:
-            # Dynamic content - use MPD update period
-            update_period = manifest_mpd.minimum_update_period_in_seconds
-            segment_count = int(update_period / segment_duration)
-
-        current_time = period_ancestor.start_in_seconds or 0
-        for i in range(start_number, start_number + segment_count):
-            segment = SegmentTiming(
-                start_time=current_time, duration=segment_duration, number=i
-            )
-
-            if manifest_mpd.availability_start_time:
-                segment.availability_start = (
-                    manifest_mpd.availability_start_time_in_seconds + current_time
-                )
-                segment.availability_end = segment.availability_start + segment_duration
-
-            segments.append(segment)
-            current_time += segment_duration
-
-        return segments
+            return int(time_shift_buffer / segment_duration)
+        # Dynamic content - use MPD update period
+        update_period = manifest_mpd.minimum_update_period_in_seconds if manifest_mpd else TWO_SECONDS
+        return int(update_period / segment_duration)
 
 
 class RepresentationBase(Tag):  # pylint: disable=too-many-public-methods
     """Generic representation tag"""
 
-    def __init__(self, element):
-        super().__init__(element)
-        self.tag_map = {
-            "maximum_sap_period": "maximumSAPPeriod",
-            "start_with_sap": "startWithSAP",
-        }
-
-    @cached_property
-    def profile(self):
-        return self.element.attrib.get("profile")
-
-    @cached_property
-    def profiles(self):
-        return self.element.attrib.get("profiles")
-
-    @cached_property
-    def width(self):
-        return get_int_value(self.element.attrib.get("width"))
-
-    @cached_property
-    def height(self):
-        return get_int_value(self.element.attrib.get("height"))
-
-    @cached_property
-    def sar(self):
-        return self.element.attrib.get("sar")
-
-    @cached_property
-    def frame_rate(self):
-        return self.element.attrib.get("frameRate")
-
-    @cached_property
-    def audio_sampling_rate(self):
-        return self.element.attrib.get("audioSamplingRate")
-
-    @cached_property
-    def mime_type(self):
-        return self.element.attrib.get("mimeType")
-
-    @cached_property
-    def segment_profiles(self):
-        return self.element.attrib.get("segmentProfiles")
-
-    @cached_property
-    def codecs(self):
-        return self.element.attrib.get("codecs")
-
-    @cached_property
-    def maximum_sap_period(self):
-        return get_float_value(self.element.attrib.get("maximumSAPPeriod"))
-
-    @cached_property
-    def start_with_sap(self):
-        return get_int_value(self.element.attrib.get("startWithSAP"))
-
-    @cached_property
-    def max_playout_rate(self):
-        return get_float_value(self.element.attrib.get("maxPlayoutRate"))
-
-    @cached_property
-    def coding_dependency(self):
-        return get_bool_value(self.element.attrib.get("codingDependency"))
-
-    @cached_property
-    def scan_type(self):
-        return self.element.attrib.get("scanType")
-
-    @cached_property
-    def frame_packings(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="FramePacking")
-            )
-        ]
-
-    @cached_property
-    def audio_channel_configurations(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="AudioChannelConfiguration")
-            )
-        ]
-
-    @cached_property
-    def content_protections(self):
-        return [
-            ContentProtection(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="ContentProtection")
-            )
-        ]
-
-    @cached_property
-    def essential_properties(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="EssentialProperty")
-            )
-        ]
-
-    @cached_property
-    def supplemental_properties(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SupplementalProperty")
-            )
-        ]
-
-    @cached_property
-    def inband_event_stream(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="InbandEventStream")
-            )
-        ]
+    profile = Attr()
+    profiles = Attr()
+    width = Attr(converter=get_int_value)
+    height = Attr(converter=get_int_value)
+    sar = Attr()
+    frame_rate = Attr()
+    audio_sampling_rate = Attr()
+    mime_type = Attr()
+    segment_profiles = Attr()
+    codecs = Attr()
+    maximum_sap_period = Attr("maximumSAPPeriod", converter=get_float_value)
+    start_with_sap = Attr("startWithSAP", converter=get_int_value)
+    max_playout_rate = Attr(converter=get_float_value)
+    coding_dependency = Attr(converter=get_bool_value)
+    scan_type = Attr()
+    frame_packings = Children("FramePacking", Descriptor)
+    audio_channel_configurations = Children("AudioChannelConfiguration", Descriptor)
+    content_protections = Children("ContentProtection", ContentProtection)
+    essential_properties = Children("EssentialProperty", Descriptor)
+    supplemental_properties = Children("SupplementalProperty", Descriptor)
+    inband_event_stream = Children("InbandEventStream", Descriptor)
 
 
 class SubRepresentation(RepresentationBase):
     """A sub representation tag"""
 
-    @cached_property
-    def level(self):
-        return get_int_value(self.element.attrib.get("level"))
-
-    @cached_property
-    def bandwidth(self):
-        return get_int_value(self.element.attrib.get("bandwidth"))
-
-    @cached_property
-    def dependency_level(self):
-        return get_list_of_type(int, self.element.attrib.get("dependencyLevel"))
-
-    @cached_property
-    def content_component(self):
-        return get_list_of_type(str, self.element.attrib.get("contentComponent"))
+    level = Attr(converter=get_int_value)
+    bandwidth = Attr(converter=get_int_value)
+    dependency_level = Attr(converter=partial(get_list_of_type, int))
+    content_component = Attr(converter=partial(get_list_of_type, str))
 
 
 class Representation(RepresentationBase):
     """Representation tag"""
 
-    @cached_property
-    def id(self):
-        return self.element.attrib.get("id")
-
-    @cached_property
-    def bandwidth(self):
-        return get_int_value(self.element.attrib.get("bandwidth"))
-
-    @cached_property
-    def quality_ranking(self):
-        return get_int_value(self.element.attrib.get("qualityRanking"))
-
-    @cached_property
-    def dependency_id(self):
-        return get_list_of_type(str, self.element.attrib.get("dependencyId"))
-
-    @cached_property
-    def num_channels(self):
-        return get_int_value(self.element.attrib.get("numChannels"))
-
-    @cached_property
-    def sample_rate(self):
-        return get_int_value(self.element.attrib.get("sampleRate"))
-
-    @cached_property
-    def base_urls(self):
-        return [
-            BaseURL(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="BaseURL"))
-        ]
-
-    @cached_property
-    def segment_bases(self):
-        return [
-            SegmentBase(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentBase")
-            )
-        ]
-
-    @cached_property
-    def segment_lists(self):
-        return [
-            SegmentList(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentList")
-            )
-        ]
-
-    @cached_property
-    def segment_template(self):
-        elements = self.element.xpath(LOOKUP_STR_FORMAT.format(target="SegmentTemplate"))
-        return SegmentTemplate(elements[0]) if elements else None
-
-    @cached_property
-    def sub_representations(self):
-        return [
-            SubRepresentation(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SubRepresentation")
-            )
-        ]
+    id = Attr()
+    bandwidth = Attr(converter=get_int_value)
+    quality_ranking = Attr(converter=get_int_value)
+    dependency_id = Attr(converter=partial(get_list_of_type, str))
+    num_channels = Attr(converter=get_int_value)
+    sample_rate = Attr(converter=get_int_value)
+    base_urls = Children("BaseURL", BaseURL)
+    segment_bases = Children("SegmentBase", SegmentBase)
+    segment_lists = Children("SegmentList", SegmentList)
+    segment_template = Child("SegmentTemplate", SegmentTemplate)
+    sub_representations = Children("SubRepresentation", SubRepresentation)
 
 
 class AdaptationSet(RepresentationBase):  # pylint: disable=too-many-public-methods
     """Adaptation Set tag representation"""
 
-    def __init__(self, element):
-        super().__init__(element)
-        self.tag_map = {"subsegment_starts_with_sap": "subsegmentStartsWithSAP"}
-
-    @cached_property
-    def id(self):
-        return get_int_value(self.element.attrib.get("id"))
-
-    @cached_property
-    def group(self):
-        return get_int_value(self.element.attrib.get("group"))
-
-    @cached_property
-    def lang(self):
-        return self.element.attrib.get("lang")
-
-    @cached_property
-    def label(self):
-        return self.element.attrib.get("label")
-
-    @cached_property
-    def content_type(self):
-        return self.element.attrib.get("contentType")
-
-    @cached_property
-    def par(self):
-        return self.element.attrib.get("par")
-
-    @cached_property
-    def min_bandwidth(self):
-        return get_int_value(self.element.attrib.get("minBandwidth"))
-
-    @cached_property
-    def max_bandwidth(self):
-        return get_int_value(self.element.attrib.get("maxBandwidth"))
-
-    @cached_property
-    def min_width(self):
-        return get_int_value(self.element.attrib.get("minWidth"))
-
-    @cached_property
-    def max_width(self):
-        return get_int_value(self.element.attrib.get("maxWidth"))
-
-    @cached_property
-    def min_height(self):
-        return get_int_value(self.element.attrib.get("minHeight"))
-
-    @cached_property
-    def max_height(self):
-        return get_int_value(self.element.attrib.get("maxHeight"))
-
-    @cached_property
-    def min_frame_rate(self):
-        return self.element.attrib.get("minFrameRate")
-
-    @cached_property
-    def max_frame_rate(self):
-        return self.element.attrib.get("maxFrameRate")
-
-    @cached_property
-    def segment_alignment(self):
-        return get_bool_value(self.element.attrib.get("segmentAlignment"))
-
-    @cached_property
-    def selection_priority(self):
-        return get_int_value(self.element.attrib.get("selectionPriority"))
-
-    @cached_property
-    def subsegment_starts_with_sap(self):
-        return get_int_value(self.element.attrib.get("subsegmentStartsWithSAP"))
-
-    @cached_property
-    def subsegment_alignment(self):
-        return get_bool_value(self.element.attrib.get("subsegmentAlignment"))
-
-    @cached_property
-    def bitstream_switching(self):
-        return get_bool_value(self.element.attrib.get("bitstreamSwitching"))
-
-    @cached_property
-    def accessibilities(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Accessibility")
-            )
-        ]
-
-    @cached_property
-    def roles(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Role"))
-        ]
-
-    @cached_property
-    def ratings(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="Rating"))
-        ]
-
-    @cached_property
-    def viewpoints(self):
-        return [
-            Descriptor(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Viewpoint")
-            )
-        ]
-
-    @cached_property
-    def content_components(self):
-        return [
-            ContentComponent(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="ContentComponent")
-            )
-        ]
-
-    @cached_property
-    def base_urls(self):
-        return [
-            BaseURL(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="BaseURL"))
-        ]
-
-    @cached_property
-    def segment_bases(self):
-        return [
-            SegmentBase(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentBase")
-            )
-        ]
-
-    @cached_property
-    def segment_lists(self):
-        return [
-            SegmentList(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentList")
-            )
-        ]
-
-    @cached_property
-    def segment_template(self):
-        elements = self.element.xpath(LOOKUP_STR_FORMAT.format(target="SegmentTemplate"))
-        return SegmentTemplate(elements[0]) if elements else None
-
-    @cached_property
-    def representations(self):
-        return [
-            Representation(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Representation")
-            )
-        ]
+    id = Attr(converter=get_int_value)
+    group = Attr(converter=get_int_value)
+    lang = Attr()
+    label = Attr()
+    content_type = Attr()
+    par = Attr()
+    min_bandwidth = Attr(converter=get_int_value)
+    max_bandwidth = Attr(converter=get_int_value)
+    min_width = Attr(converter=get_int_value)
+    max_width = Attr(converter=get_int_value)
+    min_height = Attr(converter=get_int_value)
+    max_height = Attr(converter=get_int_value)
+    min_frame_rate = Attr()
+    max_frame_rate = Attr()
+    segment_alignment = Attr(converter=get_bool_value)
+    selection_priority = Attr(converter=get_int_value)
+    subsegment_starts_with_sap = Attr("subsegmentStartsWithSAP", converter=get_int_value)
+    subsegment_alignment = Attr(converter=get_bool_value)
+    bitstream_switching = Attr(converter=get_bool_value)
+    accessibilities = Children("Accessibility", Descriptor)
+    roles = Children("Role", Descriptor)
+    ratings = Children("Rating", Descriptor)
+    viewpoints = Children("Viewpoint", Descriptor)
+    content_components = Children("ContentComponent", ContentComponent)
+    base_urls = Children("BaseURL", BaseURL)
+    segment_bases = Children("SegmentBase", SegmentBase)
+    segment_lists = Children("SegmentList", SegmentList)
+    segment_template = Child("SegmentTemplate", SegmentTemplate)
+    representations = Children("Representation", Representation)
@@ -0,0 +1,117 @@
+""" Declarative fields of the tag classes, each class gets one table that drives reads, writes and eager walks """
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+# turns the raw attribute value, None when it is missing, into the field value
+Converter = Callable[[Optional[str]], Any]
+
+
+@lru_cache(maxsize=1024)
+def to_camel_case(snake_case_string: str) -> str:
+    """convert snake_case to lowerCamelCase, memoized as the same few names are converted over and over"""
+    lead, *follow = snake_case_string.split("_")
+    return "".join([lead, *map(str.capitalize, follow)])
+
+
+class Field:
+    """
+        Base of the declarative fields.
+    A non-data descriptor: the first read computes the value and stores it in the instance
+    dictionary, which later reads hit directly, like cached_property but without its lock.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self) -> None:
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.compute(instance)
+        return value
+
+    def compute(self, instance: Any) -> Any:
+        """value of the field for the given tag, without caching it"""
+        raise NotImplementedError
+
+
+class Attr(Field):  # pylint: disable=too-few-public-methods
+    """An attribute of the element, its xml name defaults to the camel case of the field name"""
+
+    __slots__ = ("xml_name", "converter")
+
+    def __init__(self, xml_name: Optional[str] = None, converter: Optional[Converter] = None) -> None:
+        super().__init__()
+        self.xml_name = xml_name
+        self.converter = converter
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        super().__set_name__(owner, name)
+        if self.xml_name is None:
+            self.xml_name = to_camel_case(name)
+
+    def compute(self, instance: Any) -> Any:
+        value = instance.element.attrib.get(self.xml_name)
+        return value if self.converter is None else self.converter(value)
+
+
+class Text(Field):  # pylint: disable=too-few-public-methods
+    """The text content of the element"""
+
+    __slots__ = ()
+
+    def compute(self, instance: Any) -> Any:
+        return instance.element.text
+
+
+class Children(Field):
+    """Tags of the direct child elements with the given local name"""
+
+    __slots__ = ("xml_name", "tag_class", "module")
+
+    def __init__(self, xml_name: str, tag_class: Union[str, type]) -> None:
+        super().__init__()
+        self.xml_name = xml_name
+        self.tag_class = tag_class
+        self.module = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        super().__set_name__(owner, name)
+        self.module = owner.__module__
+
+    def resolve(self) -> type:
+        """the tag class, a name refers to a class defined further down the module of the declaring class"""
+        if isinstance(self.tag_class, str):
+            self.tag_class = getattr(sys.modules[self.module], self.tag_class)
+        return self.tag_class
+
+    def compute(self, instance: Any) -> List[Any]:
+        tag_class = self.resolve()
+        return [tag_class(member) for member in instance.child_elements(self.xml_name)]
+
+
+class Child(Children):
+    """Tag of the first direct child element with the given local name, None when there is none"""
+
+    __slots__ = ()
+
+    def compute(self, instance: Any) -> Any:
+        elements = instance.child_elements(self.xml_name)
+        return self.resolve()(elements[0]) if elements else None
+
+
+def collect_fields(tag_class: Type) -> Dict[str, Field]:
+    """fields of a class and its bases by name, a base field overridden by anything else is dropped"""
+    fields: Dict[str, Field] = {}
+    for klass in reversed(tag_class.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, Field):
+                fields[name] = value
+            else:
+                fields.pop(name, None)
+    return fields
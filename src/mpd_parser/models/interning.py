@@ -0,0 +1,144 @@
+""" Opt-in sharing of the values that repeat across the representations of a manifest and across manifests """
+import threading
+from copy import deepcopy
+from typing import Any, Dict, Hashable, List, Tuple, Type, TypeVar
+from weakref import WeakValueDictionary
+
+from lxml import etree
+
+from mpd_parser.constants import KEYS_NOT_FOR_SETTING
+from mpd_parser.models.base_tags import ContentProtection, Descriptor, Tag
+from mpd_parser.models.fields import Attr, Children
+
+# string fields whose values come from a small vocabulary, ids, urls, keys and free form values are left alone
+INTERNED_FIELDS = frozenset(
+    (
+        "scheme_id_uri",
+        "codecs",
+        "mime_type",
+        "profiles",
+        "segment_profiles",
+        "content_type",
+        "lang",
+        "frame_rate",
+        "sar",
+        "audio_sampling_rate",
+        "scan_type",
+    )
+)
+# tags shared when their elements serialize the same
+SHARED_TAG_CLASSES = (Descriptor, ContentProtection)
+# per segment and per event tags, left lazy instead of being built only to be walked
+SKIPPED_FIELDS = frozenset(("segments", "segment_urls", "events"))
+
+TagT = TypeVar("TagT", bound=Tag)
+
+
+class SharedTag:
+    """
+        Mixin of the read-only classes of shared tags, see InternPool.tag.
+    A shared tag is seen from many manifests and wraps a detached copy of an element,
+    an assignment would change all of them and none of their documents, so it is refused.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        """only the attributes set while the tag is created, see KEYS_NOT_FOR_SETTING"""
+        if key not in KEYS_NOT_FOR_SETTING:
+            raise AttributeError(f"'{type(self).__name__}' is shared by interned manifests and cannot be assigned")
+        super().__setattr__(key, value)
+
+    def update(self, **attributes: Any) -> None:
+        """refused like any assignment"""
+        raise AttributeError(f"'{type(self).__name__}' is shared by interned manifests and cannot be assigned")
+
+
+_SHARED_CLASSES: Dict[type, type] = {}
+
+
+def shared_class(tag_class: Type[TagT]) -> Type[TagT]:
+    """the read-only variant of a tag class, created once per class"""
+    shared = _SHARED_CLASSES.get(tag_class)
+    if shared is None:
+        shared = _SHARED_CLASSES[tag_class] = type(
+            f"Shared{tag_class.__name__}", (SharedTag, tag_class), {"__doc__": f"read-only {tag_class.__name__}"}
+        )
+    return shared
+
+
+class InternPool:
+    """
+        Canonical instances of repeated values, shared by every manifest interned with the pool.
+    Strings are kept for the life of the pool, the vocabulary of INTERNED_FIELDS is small.
+    Shared tags are read-only and wrap a detached copy of the first element seen, so they never keep
+    a manifest alive, and are dropped once no interned manifest uses them.
+    Thread safe, one pool is usually shared by a whole process.
+    """
+
+    def __init__(self) -> None:
+        self.strings: Dict[str, str] = {}
+        self.tags: "WeakValueDictionary[Tuple[type, bytes], Tag]" = WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def string(self, value: str) -> str:
+        """the canonical instance of an equal string"""
+        return self.strings.setdefault(value, value)
+
+    def tag(self, tag: TagT) -> TagT:
+        """the canonical instance of a structurally identical tag, same class and same serialized element"""
+        if isinstance(tag, SharedTag):
+            return tag
+        key: Hashable = (type(tag), etree.tostring(tag.element, with_tail=False))
+        shared = self.tags.get(key)
+        if shared is None:
+            candidate = intern_values(shared_class(type(tag))(deepcopy(tag.element)), self)
+            with self._lock:
+                # another thread may have added the same tag meanwhile
+                shared = self.tags.get(key)
+                if shared is None:
+                    shared = self.tags[key] = candidate
+        return shared
+
+
+def intern_values(tag: TagT, pool: InternPool) -> TagT:
+    """
+        Replace repeated values under the tag with the canonical instances of the pool.
+    Strings of INTERNED_FIELDS are shared by every tag with the same value, and the Descriptor
+    (Role, Accessibility, EssentialProperty...) and ContentProtection tags of a list are shared by
+    every list holding an identical element. Values are computed and cached on the way.
+    Shared tags are seen from many manifests and refuse assignments, assign to the manifest's own
+    tags after parsing it again. MPD.update_from drops the shared lists of the subtrees it changes,
+    they are read again from the updated elements, intern the manifest again to share them.
+    The manifest elements themselves are not touched, to_string is unaffected.
+
+    Args:
+        tag (Tag): usually the MPD returned by one of the Parser factories
+        pool (InternPool): the pool, shared by the manifests that should share values
+
+    Returns:
+        Tag: the same tag, with its values interned
+    """
+    pending: List[Tag] = [tag]
+    while pending:
+        current = pending.pop()
+        state = vars(current)
+        for name, field in current.tag_fields.items():
+            if isinstance(field, Attr):
+                if name in INTERNED_FIELDS:
+                    value = getattr(current, name)
+                    if isinstance(value, str):
+                        state[name] = pool.string(value)
+                continue
+            if not isinstance(field, Children) or name in SKIPPED_FIELDS:
+                continue
+            value = getattr(current, name)
+            if isinstance(value, list):
+                if issubclass(field.resolve(), SHARED_TAG_CLASSES):
+                    # the shared tags are interned once, when they enter the pool
+                    state[name] = [pool.tag(member) for member in value]
+                else:
+                    pending.extend(value)
+            elif value is not None:
+                pending.append(value)
+    return tag
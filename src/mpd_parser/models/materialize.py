@@ -0,0 +1,93 @@
+""" Eager materialization of a parsed manifest, computing every cached value in one walk """
+from functools import cached_property
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from mpd_parser.models.base_tags import Tag
+from mpd_parser.models.fields import Attr, Converter
+
+# errors of a getter on a malformed attribute, the value is left lazy and raises on access as before
+MATERIALIZE_ERRORS = (TypeError, ValueError, AttributeError)
+
+
+class MaterializeTable(NamedTuple):
+    """what the eager walk computes for one tag class"""
+
+    # (name, xml name, converter) of the Attr fields, read straight from the attributes
+    attributes: Tuple[Tuple[str, str, Optional[Converter]], ...]
+    # (name, getter) of every other field and cached_property, base class values first
+    getters: Tuple[Tuple[str, Callable[[Any], Any]], ...]
+
+
+_MATERIALIZE_TABLES: Dict[Type[Tag], MaterializeTable] = {}
+
+
+def materialize_table(tag_class: Type[Tag]) -> MaterializeTable:
+    """the materialize table of a tag class, built once per class from its fields and cached properties"""
+    table = _MATERIALIZE_TABLES.get(tag_class)
+    if table is None:
+        getters: Dict[str, Callable[[Any], Any]] = {}
+        for klass in reversed(tag_class.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, cached_property):
+                    getters[name] = value.func
+                else:
+                    # a field, or overridden by something that is not cached
+                    getters.pop(name, None)
+        attributes = []
+        for name, field in tag_class.tag_fields.items():
+            if isinstance(field, Attr):
+                attributes.append((name, field.xml_name, field.converter))
+            else:
+                getters[name] = field.compute
+        table = _MATERIALIZE_TABLES[tag_class] = MaterializeTable(tuple(attributes), tuple(getters.items()))
+    return table
+
+
+def materialize(tag: Tag) -> Tag:
+    """
+        Compute every cached value of the tag and of all the tags under it.
+    Attributes are read in one loop over the class table of Attr fields, other values are computed
+    by their getters, and everything is written straight into the instance dictionaries.
+    Values that are already cached are kept, derived properties stay lazy.
+    Useful for jobs that read every field, the lazy default is cheaper for those that don't.
+
+    Args:
+        tag (Tag): usually the MPD returned by one of the Parser factories
+
+    Returns:
+        Tag: the same tag, fully materialized
+    """
+    pending = [tag]
+    while pending:
+        current = pending.pop()
+        state = vars(current)
+        attributes, getters = materialize_table(type(current))
+        try:
+            attrib = current.element.attrib
+        except AttributeError:
+            # not an element, e.g. PSSH wraps an attribute value, its fields raise on access as before
+            attributes = ()
+        for name, xml_name, converter in attributes:
+            if name in state:
+                continue
+            value = attrib.get(xml_name)
+            if converter is not None:
+                try:
+                    value = converter(value)
+                except MATERIALIZE_ERRORS:
+                    continue
+            state[name] = value
+        for name, getter in getters:
+            if name in state:
+                value = state[name]
+            else:
+                try:
+                    value = getter(current)
+                except MATERIALIZE_ERRORS:
+                    continue
+                state[name] = value
+            if isinstance(value, Tag):
+                pending.append(value)
+            elif isinstance(value, list):
+                pending.extend(member for member in value if isinstance(member, Tag))
+    return tag
@@ -0,0 +1,252 @@
+""" In place update of a parsed manifest from a newer version, keeping unchanged Tag objects and their caches """
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree.ElementTree import Element
+
+from lxml import etree
+
+from mpd_parser.attribute_parsers import get_int_value
+from mpd_parser.models.base_tags import Tag
+from mpd_parser.models.interning import SharedTag
+
+# instance attributes that are not values cached from the element
+STRUCTURAL_KEYS = frozenset(("element", "tag_map", "encoding", "_derived_cache"))
+CHILD_INDEX_KEY = "child_index"
+TIMELINE_TAG = "SegmentTimeline"
+TIMELINE_ENTRY_TAG = "S"
+# from this many cached child tags, e.g. a ladder of Representations that were all read,
+# serializing the subtree once is cheaper than visiting every child when nothing changed
+BULK_COMPARE_MIN_TAGS = 32
+
+# key matching a child of the old tree with a child of the new tree
+ChildKey = Tuple[str, Any]
+
+
+def update_tag(tag: Tag, new_element: Element) -> bool:
+    """
+        Make the tag and the Tag objects cached under it wrap new_element and its subtree, keeping their caches.
+    Children are matched by local name and @id, or by their position among same-name siblings
+    when they have no id. Only matched children wrapped by a cached Tag object are visited, their Tag objects
+    move to the new element. The other children are compared by their serialization, to tell what changed.
+    No element is copied or moved, so the cost follows the values that were read rather than the size of the manifest.
+    Cached values are dropped only on tags whose attributes changed, and cached child lists keep the Tag objects
+    of matched children. S entries wrapped by Segment tags are matched by start time in a flat loop,
+    so a sliding live window only drops the Segment tags that left the window and adds the new ones.
+    The new element is taken over by the tag, the old tree is left behind.
+
+    Args:
+        tag (Tag): tag of the parsed tree to update
+        new_element (Element): the same tag, parsed from the newer manifest
+
+    Returns:
+        bool: True when anything changed
+    """
+    return _merge(tag.element, new_element, [tag], context_changed=False)
+
+
+def _merge(element: Element, new_element: Element, tags: List[Tag], context_changed: bool) -> bool:
+    """move the tags wrapping element and the tags cached under them to the new subtree, refreshing their caches"""
+    own_changed = _own_values_changed(element, new_element)
+    child_tags = _cached_child_tags(tags)
+    if not own_changed and len(child_tags) >= BULK_COMPARE_MIN_TAGS and _same_children(element, new_element):
+        _move_tags(element, new_element, tags, context_changed)
+        return False
+    if not child_tags:
+        # nothing is cached under the tags, the children only need to be compared
+        pairs: List[Tuple[Element, Element]] = []
+        children_changed = own_changed or not _same_children(element, new_element)
+    elif _node_name(element) == TIMELINE_TAG:
+        pairs, children_changed = _match_timeline_children(element, new_element, child_tags)
+    else:
+        pairs, children_changed = _match_children(element, new_element, child_tags)
+
+    subtree_changed = own_changed or children_changed
+    for old_child, new_child in pairs:
+        child_changed = _merge(old_child, new_child, child_tags[old_child], context_changed or own_changed)
+        subtree_changed = subtree_changed or child_changed
+
+    for tag in tags:
+        # the element is not a value, skip the write path of Tag.__setattr__
+        object.__setattr__(tag, "element", new_element)
+        _refresh_caches(tag, own_changed, children_changed, subtree_changed or context_changed)
+    return subtree_changed
+
+
+def _move_tags(element: Element, new_element: Element, tags: List[Tag], context_changed: bool) -> None:
+    """move the tags of an unchanged subtree to the new one, matching the children by position"""
+    child_tags = _cached_child_tags(tags)
+    if child_tags:
+        for old_child, new_child in zip(element, new_element):
+            wrapping_tags = child_tags.get(old_child)
+            if wrapping_tags is not None:
+                _move_tags(old_child, new_child, wrapping_tags, context_changed)
+    for tag in tags:
+        object.__setattr__(tag, "element", new_element)
+        vars(tag).pop(CHILD_INDEX_KEY, None)
+        if context_changed and tag._derived_cache:  # pylint: disable=protected-access
+            tag._derived_cache.clear()  # pylint: disable=protected-access
+
+
+def _node_name(node: Element) -> str:
+    """local name of an element, '#Comment' and the like for other nodes"""
+    if isinstance(node.tag, str):
+        return node.tag.rpartition("}")[2]
+    return f"#{node.tag.__name__}"
+
+
+def _own_values_changed(element: Element, new_element: Element) -> bool:
+    """True when the attributes or the text differ, whitespace-only text differences are ignored"""
+    if element.items() != new_element.items():
+        return True
+    return (element.text or "").strip() != (new_element.text or "").strip()
+
+
+def _same_children(element: Element, new_element: Element) -> bool:
+    """
+        True when both elements have the same children, compared by serializing the subtrees in C
+    instead of walking them. The child count and the last child are checked first, live timelines change at their end.
+    """
+    child_count = len(element)
+    if child_count != len(new_element):
+        return False
+    if not child_count:
+        return True
+    if element[-1].items() != new_element[-1].items():
+        return False
+    return etree.tostring(element, with_tail=False) == etree.tostring(new_element, with_tail=False)
+
+
+def _keyed_children(element: Element) -> List[Tuple[ChildKey, Element]]:
+    """children with their matching key, (tag, @id) or (tag, position among same-tag siblings)"""
+    positions: Dict[Any, int] = {}
+    keyed = []
+    for child in element:
+        # qualified name, or the factory function of comments and processing instructions
+        tag = child.tag
+        child_id = child.get("id")
+        if child_id is not None:
+            keyed.append(((tag, child_id), child))
+            continue
+        position = positions.get(tag, 0)
+        positions[tag] = position + 1
+        keyed.append(((tag, position), child))
+    return keyed
+
+
+def _match_children(
+    element: Element, new_element: Element, child_tags: Dict[Element, List[Tag]]
+) -> Tuple[List[Tuple[Element, Element]], bool]:
+    """pair the wrapped children with their new element, True when the children differ in anything else"""
+    old_keyed = _keyed_children(element)
+    new_keyed = _keyed_children(new_element)
+    changed = [key for key, _ in old_keyed] != [key for key, _ in new_keyed]
+    old_by_key = dict(old_keyed)
+    pairs = []
+    for key, new_child in new_keyed:
+        old_child = old_by_key.get(key)
+        if old_child is None:
+            continue
+        if old_child in child_tags:
+            pairs.append((old_child, new_child))
+        elif not changed and (_own_values_changed(old_child, new_child) or not _same_children(old_child, new_child)):
+            # once something changed, the other unwrapped children need no comparison
+            changed = True
+    return pairs, changed
+
+
+def _window_offset(entries: List[Element], start: int) -> Optional[int]:
+    """index of the S entry that starts at the given time, in timescale units, None when no entry does"""
+    current_time = 0
+    for index, entry in enumerate(entries):
+        entry_start = get_int_value(entry.get("t"))
+        if entry_start is not None:
+            current_time = entry_start
+        if current_time >= start:
+            return index if current_time == start else None
+        repeat = get_int_value(entry.get("r")) or 0
+        if repeat < 0:
+            # r=-1 runs until the next explicit @t
+            return None
+        current_time += (get_int_value(entry.get("d")) or 0) * (repeat + 1)
+    return None
+
+
+def _match_timeline_children(
+    element: Element, new_element: Element, child_tags: Dict[Element, List[Tag]]
+) -> Tuple[List[Tuple[Element, Element]], bool]:
+    """
+        Move the Segment tags of the S entries that are still in the window, without recursion.
+    Entries are matched by start time, a Segment tag whose entry changed drops its values.
+    """
+    old_entries = list(element)
+    new_entries = list(new_element)
+    if not new_entries:
+        return [], bool(old_entries)
+    entry_tags = {entry.tag for entry in old_entries}
+    entry_tags.update(entry.tag for entry in new_entries)
+    if len(entry_tags) > 1 or _node_name(new_entries[0]) != TIMELINE_ENTRY_TAG:
+        # comments or unexpected elements, match them like any other children
+        return _match_children(element, new_element, child_tags)
+
+    first = _window_offset(old_entries, get_int_value(new_entries[0].get("t")) or 0)
+    if first is None:
+        # the windows do not line up, the Segment tags are built again
+        return [], True
+    changed = first > 0 or len(old_entries) != len(new_entries)
+    for old_entry, new_entry in zip(old_entries[first:], new_entries):
+        segments = child_tags.get(old_entry, ())
+        # once the window moved, only the entries of Segment tags with cached values need a comparison
+        entry_changed = (not changed or any(map(vars, segments))) and old_entry.items() != new_entry.items()
+        changed = changed or entry_changed
+        for tag in segments:
+            # the element is not a value, skip the write path of Tag.__setattr__
+            object.__setattr__(tag, "element", new_entry)
+            if entry_changed:
+                _refresh_caches(tag, own_changed=True, children_changed=False, derived_stale=True)
+    return [], changed
+
+
+def _cached_child_tags(tags: List[Tag]) -> Dict[Element, List[Tag]]:
+    """Tag objects cached on the given tags, by the element they wrap"""
+    child_tags: Dict[Element, List[Tag]] = {}
+    for tag in tags:
+        for value in vars(tag).values():
+            if isinstance(value, Tag):
+                child_tags.setdefault(value.element, []).append(value)
+            elif isinstance(value, list):
+                for member in value:
+                    if isinstance(member, Tag):
+                        child_tags.setdefault(member.element, []).append(member)
+    return child_tags
+
+
+def _is_child(member: Tag, tag: Tag) -> bool:
+    """True when the member wraps a direct child element of the tag"""
+    getparent = getattr(member.element, "getparent", None)
+    return getparent is not None and getparent() is tag.element
+
+
+def _refresh_caches(tag: Tag, own_changed: bool, children_changed: bool, derived_stale: bool) -> None:
+    """drop cached values that may be stale, rebuild cached child lists keeping the matched Tag objects"""
+    state = vars(tag)
+    # built from the elements of the old tree
+    state.pop(CHILD_INDEX_KEY, None)
+    for key, value in list(state.items()):
+        if key in STRUCTURAL_KEYS:
+            continue
+        if isinstance(value, list) and value and all(isinstance(member, Tag) for member in value):
+            if derived_stale and any(isinstance(member, SharedTag) for member in value):
+                # shared tags (see intern_values) wrap detached copies, the merge cannot update them
+                state.pop(key)
+            elif children_changed:
+                existing = {member.element: member for member in value}
+                member_class = type(value[0])
+                state[key] = [
+                    existing.get(child) or member_class(child)
+                    for child in tag.child_elements(_node_name(value[0].element))
+                ]
+        elif isinstance(value, Tag) and _is_child(value, tag):
+            continue
+        elif own_changed or children_changed:
+            state.pop(key)
+    if derived_stale and tag._derived_cache:  # pylint: disable=protected-access
+        tag._derived_cache.clear()  # pylint: disable=protected-access
@@ -1,9 +1,10 @@
-# pylint: disable=missing-function-docstring
 """ Segment and timeline related tags """
-from functools import cached_property
+from typing import Iterator, List, Optional, Tuple
+
 from mpd_parser.attribute_parsers import get_bool_value, get_float_value, get_int_value
-from mpd_parser.constants import LOOKUP_STR_FORMAT
-from mpd_parser.models.base_tags import URL, Tag
+from mpd_parser.models.base_tags import URL, SlottedTag, Tag
+from mpd_parser.models.fields import Attr, Child, Children
+from mpd_parser.timeline_utils import TimelineArrays, expand_timeline
 
 
 class Initialization(URL):
@@ -21,133 +22,101 @@ class BitstreamSwitchings(URL):
 class Segment(Tag):
     """S tag representation. A single segment of video"""
 
-    @cached_property
-    def t(self):
-        """starting time of the segment"""
-        return get_int_value(self.element.attrib.get("t"))
+    t = Attr(converter=get_int_value)  # starting time of the segment
+    d = Attr(converter=get_int_value)  # duration time of the segment
+    r = Attr(converter=get_int_value)  # number of repeating segments
+
 
-    @cached_property
-    def d(self):
-        """duration time of the segmeent"""
-        return get_int_value(self.element.attrib.get("d"))
+class CompactSegment(SlottedTag, fields_of=Segment):
+    """S tag without an instance dictionary, see SlottedTag"""
 
-    @cached_property
-    def r(self):
-        """number of repeating segments"""
-        return get_int_value(self.element.attrib.get("r"))
+    __slots__ = ("t", "d", "r")
 
 
 class SegmentBase(Tag):
     """Basic Segment tag representation"""
 
-    @cached_property
-    def timescale(self):
-        return get_int_value(self.element.attrib.get("timescale"))
-
-    @cached_property
-    def index_range(self):
-        return self.element.attrib.get("indexRange")
-
-    @cached_property
-    def index_range_exact(self):
-        return get_bool_value(self.element.attrib.get("indexRangeExact"))
-
-    @cached_property
-    def presentation_time_offset(self):
-        return get_int_value(self.element.attrib.get("presentationTimeOffset"))
-
-    @cached_property
-    def availability_time_offset(self):
-        return get_float_value(self.element.attrib.get("availabilityTimeOffset"))
-
-    @cached_property
-    def availability_time_complete(self):
-        return get_bool_value(self.element.attrib.get("availabilityTimeComplete"))
+    timescale = Attr(converter=get_int_value)
+    index_range = Attr()
+    index_range_exact = Attr(converter=get_bool_value)
+    presentation_time_offset = Attr(converter=get_int_value)
+    availability_time_offset = Attr(converter=get_float_value)
+    availability_time_complete = Attr(converter=get_bool_value)
+    initializations = Children("Initialization", Initialization)
+    representation_indexes = Children("RepresentationIndex", RepresentationIndex)
 
-    @cached_property
-    def initializations(self):
-        return [
-            Initialization(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="Initialization")
-            )
-        ]
-
-    @cached_property
-    def representation_indexes(self):
-        return [
-            RepresentationIndex(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="RepresentationIndex")
-            )
-        ]
 
 class MultipleSegmentBase(SegmentBase):
     """Multiple segments tag"""
 
-    @cached_property
-    def duration(self):
-        return get_int_value(self.element.attrib.get("duration"))
-
-    @cached_property
-    def start_number(self):
-        return get_int_value(self.element.attrib.get("startNumber"))
-
-    @cached_property
-    def segment_timeline(self):
-        elements = self.element.xpath(
-            LOOKUP_STR_FORMAT.format(target="SegmentTimeline")
-        )
-        return SegmentTimeline(elements[0]) if elements else None
-
-    @cached_property
-    def bitstream_switchings(self):
-        return [
-            BitstreamSwitchings(member)
-            for member in self.element.xpath(
-                './*[local-name(.) = "BitstreamSwitching" ]'
-            )
-        ]
+    duration = Attr(converter=get_int_value)
+    start_number = Attr(converter=get_int_value)
+    segment_timeline = Child("SegmentTimeline", "SegmentTimeline")
+    bitstream_switchings = Children("BitstreamSwitching", BitstreamSwitchings)
 
 
 class SegmentURL(Tag):
     """SegmentURL tag"""
 
-    @cached_property
-    def media(self):
-        return self.element.attrib.get("media")
+    media = Attr()
+    media_range = Attr()
+    index = Attr()
+    index_range = Attr()
 
-    @cached_property
-    def media_range(self):
-        return self.element.attrib.get("mediaRange")
 
-    @cached_property
-    def index(self):
-        return self.element.attrib.get("index")
+class CompactSegmentURL(SlottedTag, fields_of=SegmentURL):
+    """SegmentURL tag without an instance dictionary, see SlottedTag"""
 
-    @cached_property
-    def index_range(self):
-        return self.element.attrib.get("indexRange")
+    __slots__ = ("media", "media_range", "index", "index_range")
 
 
 class SegmentList(MultipleSegmentBase):
     """SegmentList tag"""
 
-    @cached_property
-    def segment_urls(self):
-        return [
-            SegmentURL(member)
-            for member in self.element.xpath(
-                LOOKUP_STR_FORMAT.format(target="SegmentURL")
-            )
-        ]
+    segment_urls = Children("SegmentURL", SegmentURL)
+
+    def compact_segment_urls(self) -> List[CompactSegmentURL]:
+        """
+            Low memory alternative to segment_urls, for lists with thousands of entries.
+        Builds a new list on every call and does not cache it on the tag, keep the list while it is used
+        and build it again after MPD.update_from.
+        """
+        return [CompactSegmentURL(member) for member in self.child_elements("SegmentURL")]
+
 
 class SegmentTimeline(Tag):
     """SegmentTimeline tag repr"""
 
-    @cached_property
-    def segments(self):
-        return [
-            Segment(member)
-            for member in self.element.xpath(LOOKUP_STR_FORMAT.format(target="S"))
-        ]
+    segments = Children("S", Segment)
+
+    def compact_segments(self) -> List[CompactSegment]:
+        """
+            Low memory alternative to segments, for timelines with thousands of entries.
+        Builds a new list on every call and does not cache it on the tag, keep the list while it is used
+        and build it again after MPD.update_from.
+        """
+        return [CompactSegment(member) for member in self.child_elements("S")]
+
+    def to_arrays(self, start_number: int = 1, end: Optional[int] = None) -> TimelineArrays:
+        """
+            Expand the S entries, including their @r repeats, into contiguous arrays.
+        Reads the S elements directly, no Segment tag is created.
+
+        Args:
+            start_number: number of the first segment, usually the parent's startNumber
+            end: end of the timeline in timescale units, resolves a trailing r=-1
+
+        Returns:
+            TimelineArrays: segment start times (t), durations (d) and numbers
+        """
+        return expand_timeline(self.iter_entries(), start_number=start_number, end=end)
+
+    def iter_entries(self) -> Iterator[Tuple[Optional[int], Optional[int], Optional[int]]]:
+        """(t, d, r) values of the S elements in document order, read without creating Segment tags"""
+        for member in self.child_elements("S"):
+            attrib = member.attrib
+            yield (
+                get_int_value(attrib.get("t")),
+                get_int_value(attrib.get("d")),
+                get_int_value(attrib.get("r")),
+            )
@@ -3,13 +3,28 @@ Main module of the package, Parser class
 """
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
 from re import Match, sub
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Type, Union
 from urllib.request import Request, urlopen
 
 from lxml import etree
 
-from mpd_parser.exceptions import UnicodeDeclaredError, UnknownElementTreeParseError, UnknownValueError
-from mpd_parser.models.composite_tags import MPD
+from mpd_parser.async_http import NOT_MODIFIED, AsyncHTTPClient, ValidatedManifest
+from mpd_parser.batch import BatchResult, Summarizer, summarize_manifest
+from mpd_parser.exceptions import (
+    ManifestFetchError,
+    UnicodeDeclaredError,
+    UnknownElementTreeParseError,
+    UnknownValueError,
+)
+from mpd_parser.models.base_tags import Tag
+from mpd_parser.models.composite_tags import MPD, AdaptationSet, Period
+from mpd_parser.models.materialize import materialize
+from mpd_parser.parser_profiles import DEFAULT_PROFILE, ParserProfile, get_xml_parser
 
 # module level logger, application will configure formatting and handlers
 logger = logging.getLogger(__name__)
@@ -17,22 +32,59 @@ logger = logging.getLogger(__name__)
 # Regular expression to match encoding declaration in XML
 ENCODING_PATTERN = r"<\?.*?\s(encoding=\"\S*\").*\?>"
 
+# tags that can be emitted one by one while streaming a manifest
+STREAMABLE_TAGS: Dict[str, Type[Tag]] = {"Period": Period, "AdaptationSet": AdaptationSet}
+
+# files sent to a worker process at once, amortizes the inter-process round trips
+DEFAULT_BATCH_CHUNKSIZE = 16
+URL_PREFIXES = ("http://", "https://")
+
+# anything parse_concurrently accepts: raw bytes, xml text, a url or a file path
+ManifestSource = Union[bytes, bytearray, memoryview, str, os.PathLike]
+
+
+@contextmanager
+def _parse_errors(message: str, *args: Any) -> Iterator[None]:
+    """translate failures of lxml parsing operations to the package exceptions, logging unexpected ones"""
+    try:
+        yield
+    except ValueError as err:
+        if "Unicode" in err.args[0]:
+            raise UnicodeDeclaredError() from err
+        logger.exception(message, *args)
+        raise UnknownValueError() from err
+    except Exception as err:
+        logger.exception(message, *args)
+        raise UnknownElementTreeParseError() from err
+
 
 class Parser:
     """
     Parser class, holds factories to work with manifest files.
     can parse:
     1. from_string
-    2. from_file
-    3. from_url
+    2. from_bytes
+    3. from_file
+    4. from_url
+    5. from_url_async
+    and stream large manifests tag by tag:
+    1. stream_file
+    2. stream_url
+    and parse many manifests at once:
+    1. parse_many, on a process pool
+    2. parse_concurrently, on a thread pool
     """
 
     @classmethod
-    def from_string(cls, manifest_as_string: str) -> MPD:
+    def from_string(
+        cls, manifest_as_string: str, profile: ParserProfile = DEFAULT_PROFILE, eager: bool = False
+    ) -> MPD:
         """generate a parsed mpd object from a given string
 
         Args:
             manifest_as_string (str): string repr of a manifest file.
+            profile (ParserProfile): lxml parser settings
+            eager (bool): compute every value up front, see materialize
 
         Returns:
             an object representing the MPD tag and all it's XML goodies
@@ -47,65 +99,245 @@ class Parser:
                 return ""
 
             manifest_as_string = sub(ENCODING_PATTERN, cut_and_burn, manifest_as_string)
-        try:
-            root = etree.fromstring(manifest_as_string)
-        except ValueError as err:
-            if "Unicode" in err.args[0]:
-                raise UnicodeDeclaredError() from err
-            logger.exception("Failed to parse manifest string")
-            raise UnknownValueError() from err
-        except Exception as err:
-            logger.exception("Failed to parse manifest string")
-            raise UnknownElementTreeParseError() from err
+        with _parse_errors("Failed to parse manifest string"):
+            root = etree.fromstring(manifest_as_string, parser=get_xml_parser(profile))
         if encoding:
-            return MPD(root, encoding=encoding[0].groups()[0])
-        return MPD(root)
+            return cls._build(MPD(root, encoding=encoding[0].groups()[0]), eager)
+        return cls._build(MPD(root), eager)
 
     @classmethod
-    def from_file(cls, manifest_file_name: str) -> MPD:
+    def from_bytes(
+        cls,
+        manifest_as_bytes: Union[bytes, bytearray, memoryview],
+        profile: ParserProfile = DEFAULT_PROFILE,
+        eager: bool = False,
+    ) -> MPD:
+        """generate a parsed mpd object from raw manifest bytes
+
+        The payload is handed to lxml as is, without decoding or stripping the encoding declaration,
+        lxml reads it through the buffer protocol so it is not copied.
+
+        Args:
+            manifest_as_bytes (bytes, bytearray or memoryview): raw content of a manifest file.
+            profile (ParserProfile): lxml parser settings
+            eager (bool): compute every value up front, see materialize
+
+        Returns:
+            an object representing the MPD tag and all it's XML goodies,
+            MPD.encoding holds the encoding detected by lxml
+        """
+        with _parse_errors("Failed to parse manifest bytes"):
+            root = etree.fromstring(manifest_as_bytes, parser=get_xml_parser(profile))
+        return cls._build(MPD(root, encoding=root.getroottree().docinfo.encoding), eager)
+
+    @classmethod
+    def from_file(
+        cls, manifest_file_name: str, profile: ParserProfile = DEFAULT_PROFILE, eager: bool = False
+    ) -> MPD:
         """
             Generate a parsed mpd object from a given file name
         Args:
             manifest_file_name (str): file name to parse
+            profile (ParserProfile): lxml parser settings
+            eager (bool): compute every value up front, see materialize
 
         Returns:
             an object representing the MPD tag and all it's XML goodies
         """
-        try:
-            tree = etree.parse(manifest_file_name)
-        except ValueError as err:
-            if "Unicode" in err.args[0]:
-                raise UnicodeDeclaredError() from err
-            logger.exception("Failed to parse manifest file %s", manifest_file_name)
-            raise UnknownValueError() from err
-        except Exception as err:
-            logger.exception("Failed to parse manifest file %s", manifest_file_name)
-            raise UnknownElementTreeParseError() from err
-        return MPD(tree.getroot())
+        with _parse_errors("Failed to parse manifest file %s", manifest_file_name):
+            tree = etree.parse(manifest_file_name, parser=get_xml_parser(profile))
+        return cls._build(MPD(tree.getroot()), eager)
 
     @classmethod
-    def from_url(cls, url: str) -> MPD:
+    def from_url(cls, url: str, profile: ParserProfile = DEFAULT_PROFILE, eager: bool = False) -> MPD:
         """
             Generate a parsed mpd object from a given URL
         Args:
             url (str): the url of the file to parse
+            profile (ParserProfile): lxml parser settings
+            eager (bool): compute every value up front, see materialize
+
+        Returns:
+            an object representing the MPD tag and all it's XML goodies
+        """
+        with _parse_errors("Failed to parse manifest from URL %s", url):
+            req = Request(url, headers={"User-Agent": "mpd-parser/1.0"})
+            with urlopen(req) as manifest_file:
+                tree = etree.parse(manifest_file, parser=get_xml_parser(profile))
+        return cls._build(MPD(tree.getroot()), eager)
+
+    @classmethod
+    async def from_url_async(
+        cls, url: str, client: Optional[AsyncHTTPClient] = None, profile: ParserProfile = DEFAULT_PROFILE
+    ) -> MPD:
+        """
+            Generate a parsed mpd object from a given URL, without blocking the event loop
+        With a shared client, connections are kept alive per host and the request is conditional
+        on the ETag / Last-Modified of the previous response for the same URL.
+        When the server answers 304 the previously parsed MPD object is returned as is.
+        Without a client, a temporary one is used for this single request.
+
+        Args:
+            url (str): the url of the file to parse
+            client (AsyncHTTPClient): client to reuse across calls
+            profile (ParserProfile): lxml parser settings
 
         Returns:
             an object representing the MPD tag and all it's XML goodies
+
+        Raises:
+            ManifestFetchError: the request failed or the server answered with an error status
+        """
+        if client is None:
+            async with AsyncHTTPClient() as temporary_client:
+                return await cls.from_url_async(url, client=temporary_client, profile=profile)
+
+        previous = client.validated_manifest(url)
+        headers = previous.conditional_headers() if previous else {}
+        response = await client.get(url, headers=headers)
+        if response.status == NOT_MODIFIED and previous:
+            return previous.mpd
+        if response.status != 200:
+            raise ManifestFetchError(f"GET {url} answered {response.status}")
+
+        mpd = cls.from_bytes(response.body, profile=profile)
+        client.remember_manifest(
+            url,
+            ValidatedManifest(
+                mpd=mpd, etag=response.headers.get("etag"), last_modified=response.headers.get("last-modified")
+            ),
+        )
+        return mpd
+
+    @classmethod
+    def stream_file(
+        cls, manifest_file_name: str, tag: str = "Period", profile: ParserProfile = DEFAULT_PROFILE
+    ) -> Iterator[Tag]:
+        """
+            Parse a manifest file incrementally, yielding each Period (or AdaptationSet) as soon as it is complete
+        Already processed tags are cleared and detached from the tree, so memory is bounded
+        by the largest single tag instead of the whole manifest.
+        A yielded tag is only valid until the next one is requested.
+        Its ancestors (MPD attributes, enclosing Period) stay reachable through the element.
+
+        Args:
+            manifest_file_name (str): file name to parse
+            tag (str): one of STREAMABLE_TAGS, "Period" or "AdaptationSet"
+            profile (ParserProfile): lxml parser settings
+
+        Returns:
+            an iterator over the tag objects, in document order
         """
-        try:
+        with _parse_errors("Failed to stream manifest file %s", manifest_file_name):
+            yield from cls._iter_completed_tags(manifest_file_name, tag, profile)
+
+    @classmethod
+    def stream_url(cls, url: str, tag: str = "Period", profile: ParserProfile = DEFAULT_PROFILE) -> Iterator[Tag]:
+        """
+            Parse a manifest from a URL incrementally, see stream_file
+        Args:
+            url (str): the url of the file to parse
+            tag (str): one of STREAMABLE_TAGS, "Period" or "AdaptationSet"
+            profile (ParserProfile): lxml parser settings
+
+        Returns:
+            an iterator over the tag objects, in document order
+        """
+        with _parse_errors("Failed to stream manifest from URL %s", url):
             req = Request(url, headers={"User-Agent": "mpd-parser/1.0"})
             with urlopen(req) as manifest_file:
-                tree = etree.parse(manifest_file)
-        except ValueError as err:
-            if "Unicode" in err.args[0]:
-                raise UnicodeDeclaredError() from err
-            logger.exception("Failed to parse manifest from URL %s", url)
-            raise UnknownValueError() from err
-        except Exception as err:
-            logger.exception("Failed to parse manifest from URL %s", url)
-            raise UnknownElementTreeParseError() from err
-        return MPD(tree.getroot())
+                yield from cls._iter_completed_tags(manifest_file, tag, profile)
+
+    @staticmethod
+    def _build(mpd: MPD, eager: bool) -> MPD:
+        """final step of the factories, materializes the whole tree in eager mode"""
+        return materialize(mpd) if eager else mpd
+
+    @classmethod
+    def parse_many(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        cls,
+        manifest_file_names: Iterable[Union[str, os.PathLike]],
+        workers: Optional[int] = None,
+        summarize: Summarizer = summarize_manifest,
+        profile: ParserProfile = DEFAULT_PROFILE,
+        chunksize: int = DEFAULT_BATCH_CHUNKSIZE,
+    ) -> Iterator[BatchResult]:
+        """
+            Parse many manifest files on a pool of worker processes
+        lxml elements cannot be pickled, so each worker parses its file and returns summarize(mpd) instead,
+        a ManifestSummary by default. Pass a module level function to get other values back,
+        e.g. Parser.to_string for the serialized manifest.
+        A file that fails, unreadable, malformed or rejected by summarize, does not stop the batch,
+        its result carries the error instead.
+
+        Args:
+            manifest_file_names (iterable): paths of the files to parse
+            workers (int): number of worker processes, defaults to the number of CPUs
+            summarize (callable): picklable function turning an MPD into a picklable value
+            profile (ParserProfile): lxml parser settings
+            chunksize (int): files sent to a worker at once
+
+        Returns:
+            an iterator over BatchResult, in the order of manifest_file_names
+        """
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(
+                _parse_file_in_worker, manifest_file_names, repeat(summarize), repeat(profile), chunksize=chunksize
+            )
+
+    @classmethod
+    def parse_concurrently(
+        cls,
+        sources: Iterable[ManifestSource],
+        workers: Optional[int] = None,
+        profile: ParserProfile = DEFAULT_PROFILE,
+        return_exceptions: bool = False,
+    ) -> List[Union[MPD, Exception]]:
+        """
+            Parse manifests on a pool of threads, in process
+        lxml releases the GIL while it parses and every thread uses its own parser, so parsing
+        runs in parallel and the returned MPD objects need no pickling. See Tag for what is safe
+        to do with them once they are shared between threads.
+        A source is parsed with from_bytes when it is bytes, from_string when it is xml text,
+        from_url when it starts with http:// or https:// and from_file otherwise.
+
+        Args:
+            sources (iterable): manifests as bytes, xml strings, urls or file paths
+            workers (int): number of threads, ThreadPoolExecutor's default when None
+            profile (ParserProfile): lxml parser settings
+            return_exceptions (bool): put the error of a failed source in its place instead of raising it
+
+        Returns:
+            list: an MPD, or an exception when return_exceptions is set, per source in the given order
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(cls._parse_source, source, profile) for source in sources]
+            if not return_exceptions:
+                return [future.result() for future in futures]
+            return [future.exception() or future.result() for future in futures]
+
+    @classmethod
+    def _parse_source(cls, source: ManifestSource, profile: ParserProfile) -> MPD:
+        """pick the factory matching the kind of source"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(source, profile=profile)
+        if isinstance(source, str) and source.lstrip().startswith("<"):
+            return cls.from_string(source, profile=profile)
+        if isinstance(source, str) and source.startswith(URL_PREFIXES):
+            return cls.from_url(source, profile=profile)
+        return cls.from_file(os.fspath(source), profile=profile)
+
+    @classmethod
+    def _iter_completed_tags(
+        cls, source: Union[str, BinaryIO], tag: str, profile: ParserProfile
+    ) -> Iterator[Tag]:
+        """yield tag objects on their end event, then drop their elements from the tree"""
+        tag_class = STREAMABLE_TAGS[tag]
+        events = etree.iterparse(source, events=("end",), tag=f"{{*}}{tag}", **profile.iterparse_options())
+        for _, element in events:
+            yield tag_class(element)
+            element.clear(keep_tail=False)
+            element.getparent().remove(element)
 
     @classmethod
     def to_string(cls, mpd: MPD) -> str:
@@ -117,3 +349,15 @@ class Parser:
                 a string representation of the MPD object, xml formatted dash mpeg manifest
         """
         return etree.tostring(mpd.element).decode("utf-8")
+
+
+def _parse_file_in_worker(
+    manifest_file_name: Union[str, os.PathLike], summarize: Summarizer, profile: ParserProfile
+) -> BatchResult:
+    """entry point of the parse_many worker processes"""
+    path = os.fspath(manifest_file_name)
+    try:
+        return BatchResult(path=path, value=summarize(Parser.from_file(path, profile=profile)))
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        # any failure of a single file, unreadable, malformed or rejected by summarize, stays in its result
+        return BatchResult(path=path, error=err)
@@ -0,0 +1,65 @@
+""" lxml parser settings used by the Parser factories, and a per-thread pool of configured parsers """
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict
+
+from lxml import etree
+
+# XMLParser options that lxml's iterparse does not accept
+NON_ITERPARSE_OPTIONS = ("collect_ids",)
+
+
+@dataclass(frozen=True)
+class ParserProfile:
+    """
+        Options for the lxml XMLParser used to build the tree.
+    The defaults keep the document as written (whitespace and comments survive to_string)
+    while skipping work the model never needs: ID collection, entity resolution, DTD loading
+    and network access.
+    """
+
+    remove_blank_text: bool = False  # drop whitespace-only text nodes
+    remove_comments: bool = False  # drop comment nodes
+    huge_tree: bool = False  # lift libxml2 limits on depth and text size
+    collect_ids: bool = False  # build the xml:id lookup table
+    resolve_entities: bool = False  # substitute entity references
+    load_dtd: bool = False  # load an external DTD
+    no_network: bool = True  # forbid network access for related files
+
+    def xml_parser_options(self) -> dict:
+        """keyword arguments for etree.XMLParser"""
+        return asdict(self)
+
+    def iterparse_options(self) -> dict:
+        """keyword arguments for etree.iterparse"""
+        options = asdict(self)
+        for option in NON_ITERPARSE_OPTIONS:
+            options.pop(option)
+        return options
+
+
+# safe defaults, the tree keeps every node of the original document
+DEFAULT_PROFILE = ParserProfile()
+# smallest and fastest tree, for large manifests that are read and not written back
+COMPACT_PROFILE = ParserProfile(remove_blank_text=True, remove_comments=True, huge_tree=True)
+
+# lxml parsers must not be shared between threads, each thread keeps its own per profile
+_thread_local = threading.local()
+
+
+def get_xml_parser(profile: ParserProfile = DEFAULT_PROFILE) -> etree.XMLParser:
+    """
+        Return the calling thread's XMLParser for the given profile, creating it on first use
+    Args:
+        profile (ParserProfile): parser settings
+
+    Returns:
+        etree.XMLParser: parser to pass to etree.fromstring / etree.parse
+    """
+    parsers: Dict[ParserProfile, etree.XMLParser] = getattr(_thread_local, "parsers", None)
+    if parsers is None:
+        parsers = _thread_local.parsers = {}
+    parser = parsers.get(profile)
+    if parser is None:
+        parser = parsers[profile] = etree.XMLParser(**profile.xml_parser_options())
+    return parser
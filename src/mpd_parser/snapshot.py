@@ -0,0 +1,267 @@
+"""
+Immutable, picklable snapshot of a parsed manifest.
+A snapshot keeps the main values of periods, adaptation sets and representations as plain records,
+and every SegmentTimeline expanded into shared int64 columns. It serializes to a flat buffer that
+loads without copying the columns, e.g. from multiprocessing.shared_memory, so one process can
+parse a manifest and many others can read it without reparsing the XML.
+"""
+import json
+import struct
+import sys
+from array import array
+from dataclasses import asdict, dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from mpd_parser.models.composite_tags import MPD, SegmentTemplate
+from mpd_parser.timeline_utils import TIMELINE_ARRAY_TYPECODE, TimelineArrays
+
+SNAPSHOT_MAGIC = b"MPDSNAP1"
+# byte size of the JSON header, follows the magic
+HEADER_SIZE = struct.Struct("<Q")
+# the columns start on a multiple of their item size
+COLUMN_ALIGNMENT = 8
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class TimelineRecord:
+    """An expanded SegmentTimeline, the segments [offset, offset + length) of the snapshot columns"""
+
+    offset: int
+    length: int
+    timescale: int
+    presentation_time_offset: int
+
+
+@dataclass(frozen=True)
+class RepresentationRecord:
+    """Main values of a Representation"""
+
+    id: Optional[str]
+    bandwidth: Optional[int]
+    codecs: Optional[str]
+    mime_type: Optional[str]
+    width: Optional[int]
+    height: Optional[int]
+    timeline: Optional[int]  # index in MPDSnapshot.timelines, from its own or the AdaptationSet's template
+
+
+@dataclass(frozen=True)
+class AdaptationSetRecord:
+    """Main values of an AdaptationSet"""
+
+    id: Optional[int]
+    content_type: Optional[str]
+    mime_type: Optional[str]
+    lang: Optional[str]
+    representations: Tuple[RepresentationRecord, ...]
+
+
+@dataclass(frozen=True)
+class PeriodRecord:
+    """Main values of a Period"""
+
+    id: Optional[str]
+    start_in_seconds: float
+    duration: Optional[str]
+    adaptation_sets: Tuple[AdaptationSetRecord, ...]
+
+
+@dataclass(frozen=True)
+class MPDSnapshot:  # pylint: disable=too-many-instance-attributes
+    """
+        Read-only copy of a parsed manifest that does not depend on lxml.
+    The segment columns are arrays when the snapshot is built from an MPD, and memoryviews
+    into the source buffer when it is loaded with from_buffer. Such a snapshot must be released
+    before the buffer is, e.g. before closing a SharedMemory.
+    """
+
+    type: Optional[str]
+    profiles: Optional[str]
+    publish_time: Optional[str]
+    availability_start_time: Optional[str]
+    minimum_update_period: Optional[str]
+    media_presentation_duration: Optional[str]
+    periods: Tuple[PeriodRecord, ...]
+    timelines: Tuple[TimelineRecord, ...]
+    segment_times: Sequence[int]
+    segment_durations: Sequence[int]
+    segment_numbers: Sequence[int]
+
+    @classmethod
+    def from_mpd(cls, mpd: MPD) -> "MPDSnapshot":
+        """take a snapshot of a parsed manifest"""
+        columns = _TimelineColumns()
+        periods = []
+        for period in mpd.periods:
+            adaptation_sets = []
+            for adaptation_set in period.adaptation_sets:
+                representations = tuple(
+                    RepresentationRecord(
+                        id=representation.id,
+                        bandwidth=representation.bandwidth,
+                        codecs=representation.codecs,
+                        mime_type=representation.mime_type,
+                        width=representation.width,
+                        height=representation.height,
+                        timeline=columns.add(representation.segment_template or adaptation_set.segment_template),
+                    )
+                    for representation in adaptation_set.representations
+                )
+                adaptation_sets.append(
+                    AdaptationSetRecord(
+                        id=adaptation_set.id,
+                        content_type=adaptation_set.content_type,
+                        mime_type=adaptation_set.mime_type,
+                        lang=adaptation_set.lang,
+                        representations=representations,
+                    )
+                )
+            periods.append(
+                PeriodRecord(
+                    id=period.id,
+                    start_in_seconds=period.start_in_seconds,
+                    duration=period.duration,
+                    adaptation_sets=tuple(adaptation_sets),
+                )
+            )
+        return cls(
+            **{name: getattr(mpd, name) for name in _MANIFEST_FIELDS},
+            periods=tuple(periods),
+            timelines=tuple(columns.timelines),
+            segment_times=columns.arrays.t,
+            segment_durations=columns.arrays.d,
+            segment_numbers=columns.arrays.number,
+        )
+
+    def timeline_arrays(self, timeline: Union[int, TimelineRecord]) -> TimelineArrays:
+        """the segments of one timeline, slices of the shared columns"""
+        record = self.timelines[timeline] if isinstance(timeline, int) else timeline
+        window = slice(record.offset, record.offset + record.length)
+        return TimelineArrays(
+            t=self.segment_times[window], d=self.segment_durations[window], number=self.segment_numbers[window]
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+            Serialize the snapshot.
+        Layout: magic, JSON header size, JSON header with the records, padding,
+        then the three int64 columns in native byte order.
+        """
+        header = {name: getattr(self, name) for name in _RECORD_FIELDS}
+        header["byteorder"] = sys.byteorder
+        header["segments"] = len(self.segment_times)
+        encoded_header = json.dumps(header, default=asdict, separators=(",", ":")).encode("utf-8")
+        prefix = SNAPSHOT_MAGIC + HEADER_SIZE.pack(len(encoded_header)) + encoded_header
+        padding = b"\0" * (-len(prefix) % COLUMN_ALIGNMENT)
+        columns = (self.segment_times, self.segment_durations, self.segment_numbers)
+        return b"".join([prefix, padding, *(memoryview(column).cast("B") for column in columns)])
+
+    @classmethod
+    def from_buffer(cls, buffer: Buffer) -> "MPDSnapshot":
+        """
+            Load a snapshot written by to_bytes.
+        Only the header is decoded, the segment columns are memoryviews into the buffer.
+
+        Raises:
+            ValueError: when the buffer does not hold a whole snapshot of this machine's byte order
+        """
+        view = memoryview(buffer).cast("B")
+        if view[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError("buffer does not hold an MPD snapshot")
+        header_start = len(SNAPSHOT_MAGIC) + HEADER_SIZE.size
+        (header_size,) = HEADER_SIZE.unpack_from(view, len(SNAPSHOT_MAGIC))
+        header = json.loads(bytes(view[header_start:header_start + header_size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"snapshot was written on a {header['byteorder']} endian machine")
+
+        column_size = header["segments"] * array(TIMELINE_ARRAY_TYPECODE).itemsize
+        offset = header_start + header_size
+        offset += -offset % COLUMN_ALIGNMENT
+        if len(view) < offset + 3 * column_size:
+            # shared memory blocks may be larger than the snapshot, never shorter
+            raise ValueError("buffer is shorter than the snapshot it holds")
+        times, durations, numbers = (
+            view[start:start + column_size].cast(TIMELINE_ARRAY_TYPECODE)
+            for start in (offset, offset + column_size, offset + 2 * column_size)
+        )
+        return cls(
+            **{name: header[name] for name in _MANIFEST_FIELDS},
+            periods=tuple(_period_from_dict(period) for period in header["periods"]),
+            timelines=tuple(TimelineRecord(**timeline) for timeline in header["timelines"]),
+            segment_times=times,
+            segment_durations=durations,
+            segment_numbers=numbers,
+        )
+
+    def to_shared_memory(self, name: Optional[str] = None) -> SharedMemory:
+        """
+            Copy the snapshot into a new shared memory block.
+        Readers attach with SharedMemory(name) and load it with MPDSnapshot.from_buffer(shm.buf),
+        the creator is responsible for unlink()
+        """
+        data = self.to_bytes()
+        shared_memory = SharedMemory(name=name, create=True, size=len(data))
+        shared_memory.buf[:len(data)] = data
+        return shared_memory
+
+    def __reduce__(self) -> Tuple[Any, Tuple[bytes]]:
+        # memoryview columns cannot be pickled, the serialized form can
+        return MPDSnapshot.from_buffer, (self.to_bytes(),)
+
+
+_MANIFEST_FIELDS = (
+    "type",
+    "profiles",
+    "publish_time",
+    "availability_start_time",
+    "minimum_update_period",
+    "media_presentation_duration",
+)
+_RECORD_FIELDS = (*_MANIFEST_FIELDS, "periods", "timelines")
+
+
+class _TimelineColumns:  # pylint: disable=too-few-public-methods
+    """expanded timelines of a snapshot being built, a template shared by representations is expanded once"""
+
+    def __init__(self) -> None:
+        self.arrays = TimelineArrays(*(array(TIMELINE_ARRAY_TYPECODE) for _ in TimelineArrays._fields))
+        self.timelines: List[TimelineRecord] = []
+        self.indexes: Dict[Any, int] = {}
+
+    def add(self, segment_template: Optional[SegmentTemplate]) -> Optional[int]:
+        """index of the template's timeline in the snapshot, None when it has no SegmentTimeline"""
+        if segment_template is None or segment_template.segment_timeline is None:
+            return None
+        if segment_template.element not in self.indexes:
+            expanded = segment_template.segment_timeline.to_arrays(start_number=segment_template.start_number or 1)
+            self.indexes[segment_template.element] = len(self.timelines)
+            self.timelines.append(
+                TimelineRecord(
+                    offset=len(self.arrays.t),
+                    length=len(expanded.t),
+                    timescale=segment_template.timescale or 1,
+                    presentation_time_offset=segment_template.presentation_time_offset or 0,
+                )
+            )
+            for column, values in zip(self.arrays, expanded):
+                column.extend(values)
+        return self.indexes[segment_template.element]
+
+
+def _period_from_dict(period: Dict[str, Any]) -> PeriodRecord:
+    """rebuild the nested records from their JSON form"""
+    adaptation_sets = tuple(
+        AdaptationSetRecord(
+            **{
+                **adaptation_set,
+                "representations": tuple(
+                    RepresentationRecord(**representation) for representation in adaptation_set["representations"]
+                ),
+            }
+        )
+        for adaptation_set in period["adaptation_sets"]
+    )
+    return PeriodRecord(**{**period, "adaptation_sets": adaptation_sets})
@@ -1,11 +1,18 @@
 """ Utilities to parse, compute and handle time and duration related information in the mpd file """
 
-from datetime import datetime
-from typing import Optional
+import math
+from array import array
+from collections.abc import Sequence
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 from dataclasses import dataclass
 
+# typecode for the timeline arrays, signed 64 bit like the xs:unsignedLong values in the manifest
+TIMELINE_ARRAY_TYPECODE = "q"
+# typecode for the columns of SegmentTimingTable holding seconds
+SECONDS_ARRAY_TYPECODE = "d"
 
-@dataclass
+
+@dataclass(slots=True)
 class SegmentTiming:
     """Represents timing information for a segment
     It is a parsed and extended version of `tags.Segment` class.
@@ -14,5 +21,145 @@ class SegmentTiming:
     start_time: float  # in seconds from period start
     duration: float  # in seconds
     number: int  # segment number in sequence
-    availability_start: Optional[datetime] = None  # for live streams
-    availability_end: Optional[datetime] = None  # for live streams
+    availability_start: Optional[float] = None  # for live streams, seconds since the epoch
+    availability_end: Optional[float] = None  # for live streams, seconds since the epoch
+
+
+class SegmentTimingTable(Sequence):
+    """
+        Columnar container of segment timings.
+    Every field of SegmentTiming is kept in its own typed array, so a segment costs 40 bytes
+    instead of a full object. Missing availability times are stored as NaN.
+    Indexing returns a SegmentTiming, slicing returns a new SegmentTimingTable.
+    """
+
+    __slots__ = ("start_time", "duration", "number", "availability_start", "availability_end")
+
+    def __init__(self) -> None:
+        self.start_time = array(SECONDS_ARRAY_TYPECODE)
+        self.duration = array(SECONDS_ARRAY_TYPECODE)
+        self.number = array(TIMELINE_ARRAY_TYPECODE)
+        self.availability_start = array(SECONDS_ARRAY_TYPECODE)
+        self.availability_end = array(SECONDS_ARRAY_TYPECODE)
+
+    @classmethod
+    def from_timings(cls, timings: Iterable[SegmentTiming]) -> "SegmentTimingTable":
+        """build a table from segment timings, e.g. SegmentTemplate.iter_segment_timings()"""
+        table = cls()
+        for timing in timings:
+            table.append(timing)
+        return table
+
+    def append(self, timing: SegmentTiming) -> None:
+        """add a segment at the end of the table"""
+        self.start_time.append(timing.start_time)
+        self.duration.append(timing.duration)
+        self.number.append(timing.number)
+        self.availability_start.append(math.nan if timing.availability_start is None else timing.availability_start)
+        self.availability_end.append(math.nan if timing.availability_end is None else timing.availability_end)
+
+    def __len__(self) -> int:
+        return len(self.number)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[SegmentTiming, "SegmentTimingTable"]:
+        if isinstance(index, slice):
+            table = SegmentTimingTable()
+            for column in self.__slots__:
+                setattr(table, column, getattr(self, column)[index])
+            return table
+        availability_start = self.availability_start[index]
+        availability_end = self.availability_end[index]
+        return SegmentTiming(
+            start_time=self.start_time[index],
+            duration=self.duration[index],
+            number=self.number[index],
+            availability_start=None if math.isnan(availability_start) else availability_start,
+            availability_end=None if math.isnan(availability_end) else availability_end,
+        )
+
+
+class TimelineArrays(NamedTuple):
+    """Contiguous per-segment columns of an expanded SegmentTimeline.
+    t and d are in timescale units, number is the segment number.
+    Each column is an `array.array`, wrap it with `numpy.frombuffer` for a zero-copy ndarray.
+    """
+
+    t: array
+    d: array
+    number: array
+
+
+class TimelineRun(NamedTuple):
+    """A run of `count` consecutive segments of equal duration, in timescale units"""
+
+    t: int
+    d: int
+    number: int
+    count: Optional[int]  # None for a run without an end, like a live @duration template
+
+
+def iter_timeline_runs(
+    entries: Iterable[Tuple[Optional[int], int, Optional[int]]],
+    start_number: int = 1,
+    end: Optional[int] = None,
+) -> Iterator[TimelineRun]:
+    """
+        Resolve SegmentTimeline S entries into runs with explicit start, number and count.
+    Entries are consumed lazily with a single entry of lookahead, needed for r=-1.
+
+    Args:
+        entries: (t, d, r) values of the S elements in document order, missing values as None
+        start_number: number of the first segment, usually SegmentTemplate@startNumber
+        end: end of the timeline in timescale units, used to resolve a trailing r=-1
+
+    Returns:
+        Iterator[TimelineRun]: one run per S entry that holds at least one segment
+    """
+    current_time = 0
+    current_number = start_number
+    entries = iter(entries)
+    entry = next(entries, None)
+    while entry is not None:
+        start, duration, repeat = entry
+        next_entry = next(entries, None)
+        if start is not None:
+            current_time = start
+        count = (repeat or 0) + 1
+        if duration and repeat is not None and repeat < 0:
+            # repeat until the next S with an explicit @t, or until the end of the timeline
+            next_start = next_entry[0] if next_entry is not None else end
+            count = -(-(next_start - current_time) // duration) if next_start is not None else 1
+        if duration and count > 0:
+            yield TimelineRun(t=current_time, d=duration, number=current_number, count=count)
+            current_time += count * duration
+            current_number += count
+        entry = next_entry
+
+
+def expand_timeline(
+    entries: Iterable[Tuple[Optional[int], int, Optional[int]]],
+    start_number: int = 1,
+    end: Optional[int] = None,
+) -> TimelineArrays:
+    """
+        Expand SegmentTimeline S entries into per-segment arrays.
+    Each entry is a run of r + 1 segments with the same duration, the run is appended
+    to the arrays with bulk (C level) repeat and range operations instead of a Python
+    loop per segment.
+
+    Args:
+        entries: (t, d, r) values of the S elements in document order, missing values as None
+        start_number: number of the first segment, usually SegmentTemplate@startNumber
+        end: end of the timeline in timescale units, used to resolve a trailing r=-1
+
+    Returns:
+        TimelineArrays: segment start times, durations and numbers
+    """
+    starts = array(TIMELINE_ARRAY_TYPECODE)
+    durations = array(TIMELINE_ARRAY_TYPECODE)
+    numbers = array(TIMELINE_ARRAY_TYPECODE)
+    for run in iter_timeline_runs(entries, start_number=start_number, end=end):
+        starts.extend(range(run.t, run.t + run.count * run.d, run.d))
+        durations.extend(array(TIMELINE_ARRAY_TYPECODE, (run.d,)) * run.count)
+        numbers.extend(range(run.number, run.number + run.count))
+    return TimelineArrays(t=starts, d=durations, number=numbers)
@@ -0,0 +1,31 @@
+""" Registry of precompiled xpath evaluators for the lookup patterns used across the lib """
+from typing import Dict, Tuple
+
+from lxml import etree
+
+from mpd_parser.constants import ANCESTOR_AXIS, ANCESTOR_LOOKUP_STR_FORMAT, CHILD_AXIS, LOOKUP_STR_FORMAT
+
+LOOKUP_FORMATS: Dict[str, str] = {
+    CHILD_AXIS: LOOKUP_STR_FORMAT,
+    ANCESTOR_AXIS: ANCESTOR_LOOKUP_STR_FORMAT,
+}
+
+# compiled once per (axis, target) and reused for the life of the process
+_COMPILED_LOOKUPS: Dict[Tuple[str, str], etree.XPath] = {}
+
+
+def lookup_xpath(target: str, axis: str = CHILD_AXIS) -> etree.XPath:
+    """
+        Return the compiled xpath evaluator matching elements by local name on the given axis
+    Args:
+        target (str): local name of the element to look for, namespace is ignored
+        axis (str): one of the keys in LOOKUP_FORMATS
+
+    Returns:
+        etree.XPath: callable evaluator, call it with the context element
+    """
+    key = (axis, target)
+    evaluator = _COMPILED_LOOKUPS.get(key)
+    if evaluator is None:
+        evaluator = _COMPILED_LOOKUPS.setdefault(key, etree.XPath(LOOKUP_FORMATS[axis].format(target=target)))
+    return evaluator
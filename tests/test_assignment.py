@@ -4,6 +4,7 @@ import pytest
 from lxml import etree
 
 from mpd_parser.models.base_tags import Subset
+from mpd_parser.models.composite_tags import Period, SegmentTemplate
 from mpd_parser.parser import Parser
 
 
@@ -111,3 +112,30 @@ class TestListValueAssignment:
         subset = Subset(element)
         subset.contains = [1, 2, 3]
         assert subset.element.attrib["contains"] == "1,2,3"
+
+
+class TestBulkUpdate:
+    """test assigning many attributes at once with Tag.update"""
+
+    @staticmethod
+    def test_update_writes_every_attribute():
+        """test update writes each value under its xml name and keeps derived values truthful"""
+        template_xml = '<SegmentTemplate media="$Number$.mp4" timescale="1000" duration="2000" startNumber="1"/>'
+        element = etree.fromstring(template_xml)
+        template = SegmentTemplate(element)
+        assert template.parsed_segment_timeline[0].duration == 2.0
+        template.update(media="ad-$Number$.mp4", presentation_time_offset=500, duration=1000)
+        assert element.attrib["media"] == "ad-$Number$.mp4"
+        assert element.attrib["presentationTimeOffset"] == "500"
+        assert template.media == "ad-$Number$.mp4"
+        assert template.parsed_segment_timeline[0].duration == 1.0
+
+    @staticmethod
+    def test_update_refuses_derived_values():
+        """test a refused write in the batch still clears the derived cache of the writes before it"""
+        period = Period(etree.fromstring('<Period start="PT10S"/>'))
+        assert period.start_in_seconds == 10
+        with pytest.raises(AttributeError):
+            period.update(start="PT20S", start_in_seconds=5)
+        assert period.element.attrib["start"] == "PT20S"
+        assert period.start_in_seconds == 20
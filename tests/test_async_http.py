@@ -0,0 +1,162 @@
+"""
+Test the asyncio fetch and parse path against a local HTTP stand-in server
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from pytest import fixture, raises
+
+from mpd_parser.async_http import AsyncHTTPClient
+from mpd_parser.exceptions import ManifestFetchError
+from mpd_parser.parser import Parser
+
+MANIFEST = b'<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" publishTime="2024-01-01T00:00:00Z"/>'
+
+
+class KeepAliveFileHandler(SimpleHTTPRequestHandler):
+    """serves the repository root over HTTP/1.1, recording the client ports"""
+
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory="./../", **kwargs)
+
+    def do_GET(self):
+        self.client_ports.append(self.client_address[1])
+        super().do_GET()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class ChunkedETagHandler(BaseHTTPRequestHandler):
+    """answers with a chunked manifest and an ETag, 304 when the ETag matches"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        if self.path == "/missing.mpd":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(MANIFEST), 40):
+            chunk = MANIFEST[start:start + 40]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+def serve(handler):
+    """start a threaded server on a free port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+@fixture(name="file_server")
+def fixture_file_server():
+    KeepAliveFileHandler.client_ports = []
+    server, thread = serve(KeepAliveFileHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@fixture(name="etag_server")
+def fixture_etag_server():
+    server, thread = serve(ChunkedETagHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_from_url_async_reuses_connection_and_mpd(file_server):
+    """a 304 on If-Modified-Since returns the same MPD object over the same connection"""
+    url = f"http://127.0.0.1:{file_server.server_port}/manifests/bigBuckBunny-onDemend.mpd"
+
+    async def fetch_twice():
+        async with AsyncHTTPClient() as client:
+            first = await Parser.from_url_async(url, client=client)
+            second = await Parser.from_url_async(url, client=client)
+        return first, second
+
+    first, second = asyncio.run(fetch_twice())
+    assert first.type == "static"
+    assert first.periods[0].duration == "PT0H9M55.46S"
+    assert second is first
+    assert len(KeepAliveFileHandler.client_ports) == 2
+    assert len(set(KeepAliveFileHandler.client_ports)) == 1
+
+
+def test_from_url_async_etag_and_chunked(etag_server):
+    """chunked bodies are decoded and If-None-Match is sent on the next request"""
+    url = f"http://127.0.0.1:{etag_server.server_port}/live.mpd"
+
+    async def fetch_twice():
+        client = AsyncHTTPClient()
+        first = await Parser.from_url_async(url, client=client)
+        second = await Parser.from_url_async(url, client=client)
+        await client.close()
+        return first, second
+
+    first, second = asyncio.run(fetch_twice())
+    assert first.publish_time == "2024-01-01T00:00:00Z"
+    assert second is first
+
+
+def test_from_url_async_remembers_recent_urls_only(etag_server):
+    """validated manifests are bounded, a forgotten url is fetched and parsed again"""
+    base_url = f"http://127.0.0.1:{etag_server.server_port}"
+
+    async def fetch_alternating():
+        async with AsyncHTTPClient(max_validated_manifests=1) as client:
+            first = await Parser.from_url_async(f"{base_url}/a.mpd", client=client)
+            await Parser.from_url_async(f"{base_url}/b.mpd", client=client)
+            again = await Parser.from_url_async(f"{base_url}/a.mpd", client=client)
+            return first, again, list(client.validated_manifests)
+
+    first, again, remembered = asyncio.run(fetch_alternating())
+    assert again is not first
+    assert again.publish_time == first.publish_time
+    assert remembered == [f"{base_url}/a.mpd"]
+
+
+def test_from_url_async_without_client(etag_server):
+    """a temporary client is used when none is given"""
+    url = f"http://127.0.0.1:{etag_server.server_port}/live.mpd"
+    assert asyncio.run(Parser.from_url_async(url)).type == "dynamic"
+
+
+def test_from_url_async_error_status(etag_server):
+    """error statuses are reported as fetch errors"""
+    url = f"http://127.0.0.1:{etag_server.server_port}/missing.mpd"
+    with raises(ManifestFetchError):
+        asyncio.run(Parser.from_url_async(url))
+
+
+def test_from_url_async_connection_refused():
+    """connection failures are reported as fetch errors"""
+    server, thread = serve(ChunkedETagHandler)
+    port = server.server_port
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    with raises(ManifestFetchError):
+        asyncio.run(Parser.from_url_async(f"http://127.0.0.1:{port}/live.mpd"))
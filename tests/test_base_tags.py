@@ -215,3 +215,35 @@ def test_base_url_tag(xml_snippet, expected):
     assert base_url.availability_time_complete == expected.get(
         "availability_time_complete"
     )
+
+
+def test_tag_child_index():
+    """test children are bucketed by local name regardless of namespace, skipping comments"""
+    period_xml = """
+    <Period xmlns="urn:mpeg:dash:schema:mpd:2011" xmlns:foo="urn:foo">
+        <!-- a comment -->
+        <BaseURL>first/</BaseURL>
+        <foo:BaseURL>second/</foo:BaseURL>
+        <AdaptationSet id="1"/>
+    </Period>
+    """
+    element = etree.fromstring(period_xml)
+    tag = Tag(element)
+    assert [member.text for member in tag.child_elements("BaseURL")] == ["first/", "second/"]
+    assert len(tag.child_elements("AdaptationSet")) == 1
+    assert tag.child_elements("Representation") == []
+    assert set(tag.child_index) == {"BaseURL", "AdaptationSet"}
+
+
+def test_tag_fields_are_collected_per_class():
+    """test fields are declared once per class, and assignments are written back under their xml name"""
+    assert "scheme_id_uri" in UTCTiming.tag_fields
+    assert URL.tag_map == {"source_url": "sourceURL"}
+    assert Descriptor.attribute_names == {"scheme_id_uri": "schemeIdUri", "id": "id", "value": "value"}
+
+    element = etree.fromstring('<SegmentURL media="a.mp4"/>')
+    url = URL(element)
+    assert "tag_map" not in vars(url)
+    url.source_url = "init.mp4"
+    assert element.attrib["sourceURL"] == "init.mp4"
+    assert url.source_url == "init.mp4"
@@ -1,10 +1,15 @@
 """
 Test the composite tags classes as standalone classes
 """
+import gc
+import time
+import weakref
 
 from lxml import etree
+from pytest import mark, raises
 
-from mpd_parser.models.composite_tags import SegmentTemplate
+from mpd_parser.models import composite_tags
+from mpd_parser.models.composite_tags import MPD, Period, SegmentTemplate
 
 
 def test_segment_template_tag():
@@ -22,3 +27,182 @@ def test_segment_template_tag():
     assert segment_template.initialization == "audio-7-lav/init.mp4"
     assert segment_template.media == "audio-7-lav/$Number%05d$.mp4"
     assert segment_template.start_number == 1
+
+
+def test_segment_template_parsed_timeline_from_duration():
+    """timings are derived from @duration and the ancestor period"""
+    manifest_xml = (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static">'
+        '<Period start="PT10S" duration="PT8S">'
+        '<AdaptationSet><SegmentTemplate timescale="1000" duration="2000" startNumber="5"/></AdaptationSet>'
+        "</Period></MPD>"
+    )
+    root = etree.fromstring(manifest_xml)
+    segment_template = SegmentTemplate(root[0][0][0])
+    timings = segment_template.parsed_segment_timeline
+    assert [timing.number for timing in timings] == [5, 6, 7, 8]
+    assert [timing.start_time for timing in timings] == [10.0, 12.0, 14.0, 16.0]
+    assert all(timing.duration == 2.0 for timing in timings)
+
+
+def test_derived_values_follow_assignments():
+    """derived values are recomputed after the tag writes to its element and cannot be assigned"""
+    period = Period(etree.fromstring('<Period start="PT10S"/>'))
+    assert period.start_in_seconds == 10.0
+    period.start = "PT1M"
+    assert period.start_in_seconds == 60.0
+    with raises(AttributeError):
+        period.start_in_seconds = 5.0
+
+
+def test_derived_values_are_released_with_the_instance():
+    """derived values are cached per instance and do not keep it alive"""
+    mpd = MPD(etree.fromstring('<MPD minimumUpdatePeriod="PT4S" timeShiftBufferDepth="PT1M"/>'))
+    assert mpd.minimum_update_period_in_seconds == 4.0
+    assert mpd.time_shift_buffer_depth_in_seconds == 60.0
+    mpd_ref = weakref.ref(mpd)
+    del mpd
+    gc.collect()
+    assert mpd_ref() is None
+
+
+def test_segment_template_parsed_timeline_from_segment_timeline():
+    """timings come from the S entries, shifted by presentationTimeOffset and the period start"""
+    manifest_xml = (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="1970-01-01T00:01:40Z">'
+        '<Period start="PT10S"><AdaptationSet>'
+        '<SegmentTemplate timescale="1000" presentationTimeOffset="5000" startNumber="3">'
+        '<SegmentTimeline><S t="5000" d="2000" r="1"/><S d="1000"/></SegmentTimeline>'
+        "</SegmentTemplate>"
+        "</AdaptationSet></Period></MPD>"
+    )
+    root = etree.fromstring(manifest_xml)
+    segment_template = SegmentTemplate(root[0][0][0])
+    timings = segment_template.parsed_segment_timeline
+    assert [timing.number for timing in timings] == [3, 4, 5]
+    assert [timing.start_time for timing in timings] == [10.0, 12.0, 14.0]
+    assert [timing.duration for timing in timings] == [2.0, 2.0, 1.0]
+    assert [timing.availability_start for timing in timings] == [110.0, 112.0, 114.0]
+    assert timings[-1].availability_end == 115.0
+
+
+LIVE_TIMELINE_MANIFEST = (
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="1970-01-01T00:00:00Z">'
+    '<Period start="PT0S"><AdaptationSet>'
+    '<SegmentTemplate timescale="10" startNumber="1">'
+    '<SegmentTimeline><S t="0" d="20" r="4"/><S d="10" r="2"/></SegmentTimeline>'
+    "</SegmentTemplate>"
+    "</AdaptationSet></Period></MPD>"
+)
+
+
+@mark.parametrize(
+    "kwargs, expected_numbers",
+    [
+        ({}, [1, 2, 3, 4, 5, 6, 7, 8]),
+        ({"start_number": 4}, [4, 5, 6, 7, 8]),
+        ({"start_time": 5.0}, [3, 4, 5, 6, 7, 8]),
+        ({"start_time": 10.5}, [6, 7, 8]),
+        ({"start_number": 2, "count": 2}, [2, 3]),
+        ({"until": 9.0}, [1, 2, 3, 4, 5]),
+        ({"start_time": 4.0, "until": 10.0}, [3, 4, 5, 6]),
+    ],
+)
+def test_segment_template_iter_segment_timings(kwargs, expected_numbers):
+    """the generator honours its start and stop bounds"""
+    root = etree.fromstring(LIVE_TIMELINE_MANIFEST)
+    segment_template = SegmentTemplate(root[0][0][0])
+    assert [timing.number for timing in segment_template.iter_segment_timings(**kwargs)] == expected_numbers
+
+
+LIVE_DURATION_MANIFEST = (
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="2024-01-01T00:00:00Z" '
+    'timeShiftBufferDepth="PT60S"><Period start="PT0S"><AdaptationSet>'
+    '<SegmentTemplate timescale="1000" duration="2000" startNumber="1"/>'
+    "</AdaptationSet></Period></MPD>"
+)
+# availabilityStartTime of LIVE_DURATION_MANIFEST, in seconds since the epoch
+LIVE_DURATION_AST = 1704067200.0
+
+
+def test_segment_template_iter_segment_timings_near_the_live_edge():
+    """a start past the time shift buffer still yields the segments of a @duration template"""
+    root = etree.fromstring(LIVE_DURATION_MANIFEST)
+    segment_template = SegmentTemplate(root[0][0][0])
+    assert len(segment_template.parsed_segment_timeline) == 30
+    start_time = time.time() - LIVE_DURATION_AST - 10
+    timings = list(segment_template.iter_segment_timings(start_time=start_time, count=3))
+    assert [timing.number - timings[0].number for timing in timings] == [0, 1, 2]
+    assert timings[0].start_time <= start_time < timings[0].start_time + 2.0
+    assert [timing.number for timing in segment_template.iter_segment_timings(start_number=100, count=2)] == [100, 101]
+
+
+def test_segment_template_timing_table():
+    """the columnar table holds the same timings as the list"""
+    root = etree.fromstring(LIVE_TIMELINE_MANIFEST)
+    segment_template = SegmentTemplate(root[0][0][0])
+    assert list(segment_template.segment_timing_table) == segment_template.parsed_segment_timeline
+
+
+@mark.parametrize(
+    "presentation_time, expected_number",
+    [(0.0, 1), (1.99, 1), (2.0, 2), (10.5, 6), (12.9, 8), (13.0, None), (-1.0, None)],
+)
+def test_segment_template_segment_at_time(presentation_time, expected_number):
+    """lookup by presentation time on an explicit timeline"""
+    root = etree.fromstring(LIVE_TIMELINE_MANIFEST)
+    segment_template = SegmentTemplate(root[0][0][0])
+    segment = segment_template.segment_at_time(presentation_time)
+    assert (segment.number if segment else None) == expected_number
+
+
+def test_segment_template_segment_available_at():
+    """lookup by wall-clock time, for @duration templates as well"""
+    manifest_xml = (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="1970-01-01T00:01:40Z" '
+        'timeShiftBufferDepth="PT10S"><Period start="PT0S"><AdaptationSet>'
+        '<SegmentTemplate timescale="1000" duration="2000" startNumber="1"/>'
+        "</AdaptationSet></Period></MPD>"
+    )
+    root = etree.fromstring(manifest_xml)
+    segment_template = SegmentTemplate(root[0][0][0])
+    assert segment_template.segment_available_at(99.0) is None
+    assert segment_template.segment_available_at(100.0).number == 1
+    assert segment_template.segment_available_at(105.0).number == 3
+    # past the time shift buffer, the live edge keeps moving
+    assert segment_template.segment_available_at(110.0).number == 6
+    assert segment_template.segment_at_time(5.0).number == 3
+
+
+def test_segment_template_segment_available_now():
+    """the segment available at the current wall-clock time is found past the first time shift buffer"""
+    root = etree.fromstring(LIVE_DURATION_MANIFEST)
+    segment_template = SegmentTemplate(root[0][0][0])
+    now = time.time()
+    segment = segment_template.segment_available_at(now)
+    assert segment.number == 1 + int((now - LIVE_DURATION_AST) // 2)
+    assert segment.availability_start <= now < segment.availability_end
+    assert segment_template.segment_at_time(now - LIVE_DURATION_AST).number == segment.number
+
+
+def test_segment_template_segment_at_time_within_the_period():
+    """@duration lookups stop at the end of the period"""
+    root = etree.fromstring(
+        '<Period start="PT10S" duration="PT8S"><SegmentTemplate timescale="1000" duration="2000" startNumber="5"/>'
+        "</Period>"
+    )
+    segment_template = SegmentTemplate(root[0])
+    assert segment_template.segment_at_time(9.9) is None
+    assert segment_template.segment_at_time(17.9).number == 8
+    assert segment_template.segment_at_time(18.0) is None
+    assert segment_template.segment_available_at(12.0) is None
+
+
+def test_forward_references_ignore_subclasses_elsewhere():
+    """class names in fields resolve in the module of the declaring class, a same named subclass does not hijack them"""
+
+    class AdaptationSet(composite_tags.AdaptationSet):  # pylint: disable=unused-variable
+        """user subclass with the name of a library class"""
+
+    period = Period(etree.fromstring('<Period xmlns="urn:mpeg:dash:schema:mpd:2011"><AdaptationSet id="1"/></Period>'))
+    assert type(period.adaptation_sets[0]) is composite_tags.AdaptationSet
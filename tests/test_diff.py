@@ -0,0 +1,71 @@
+"""
+Test the structural diff of two manifests
+"""
+from mpd_parser.diff import diff
+from mpd_parser.parser import Parser
+
+MANIFEST_FORMAT = (
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic">'
+    '<Period id="p0"><AdaptationSet id="1">'
+    '<SegmentTemplate timescale="10"><SegmentTimeline>{entries}</SegmentTimeline></SegmentTemplate>'
+    "{representations}</AdaptationSet></Period>{extra_period}</MPD>"
+)
+
+
+def manifest(entries='<S t="0" d="20" r="2"/>', representations='<Representation id="v1" bandwidth="1000"/>',
+             extra_period=""):
+    return Parser.from_string(
+        MANIFEST_FORMAT.format(entries=entries, representations=representations, extra_period=extra_period)
+    )
+
+
+def test_diff_identical_manifests():
+    """no changes between equal manifests"""
+    assert not diff(manifest(), manifest())
+
+
+def test_diff_periods():
+    """periods are matched by id"""
+    result = diff(manifest(extra_period='<Period id="old"/>'), manifest(extra_period='<Period id="new"/>'))
+    assert result.added_periods == ["new"]
+    assert result.removed_periods == ["old"]
+
+
+def test_diff_representations():
+    """changed, added and removed representations"""
+    result = diff(
+        manifest(representations='<Representation id="v1" bandwidth="1000" codecs="avc1"/>'
+                                 '<Representation id="v2" bandwidth="2000"/>'),
+        manifest(representations='<Representation id="v1" bandwidth="1500" codecs="avc1"/>'
+                                 '<Representation id="v3" bandwidth="3000"/>'),
+    )
+    assert [change.path for change in result.changed_representations] == [("p0", 1, "v1")]
+    assert result.changed_representations[0].changes == {"bandwidth": (1000, 1500)}
+    assert result.added_representations == [("p0", 1, "v3")]
+    assert result.removed_representations == [("p0", 1, "v2")]
+
+
+def test_diff_timeline():
+    """a sliding window is reported as truncated at the start and extended at the end"""
+    result = diff(manifest(), manifest(entries='<S t="20" d="20" r="3"/>'))
+    assert len(result.timeline_changes) == 1
+    change = result.timeline_changes[0]
+    assert change.path == ("p0", 1)
+    assert change.old_range == (0.0, 6.0)
+    assert change.new_range == (2.0, 10.0)
+    assert change.truncated_by == 2.0
+    assert change.extended_by == 4.0
+
+
+def test_diff_positions_do_not_collide_with_ids():
+    """an AdaptationSet without id is matched by position, apart from a sibling whose integer id equals it"""
+    manifest_format = (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011"><Period id="p0">'
+        '<AdaptationSet id="1"><Representation id="v1" bandwidth="{bandwidth}"/></AdaptationSet>'
+        '<AdaptationSet><Representation id="a1" bandwidth="64"/></AdaptationSet>'
+        "</Period></MPD>"
+    )
+    result = diff(
+        Parser.from_string(manifest_format.format(bandwidth=1)), Parser.from_string(manifest_format.format(bandwidth=9))
+    )
+    assert [change.path for change in result.changed_representations] == [("p0", 1, "v1")]
@@ -0,0 +1,98 @@
+"""
+Test the persistent cache of parsed manifests
+"""
+import os
+
+from pytest import raises
+
+from mpd_parser.disk_cache import CACHE_ENTRY_SUFFIX, ManifestDiskCache
+from mpd_parser.parser import Parser
+from mpd_parser.snapshot import SNAPSHOT_MAGIC, MPDSnapshot
+from tests.conftest import MANIFESTS_DIR
+
+INPUT_FILE = f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"
+
+
+def test_disk_cache_hit_and_miss(tmp_path):
+    """the first load parses and stores the snapshot, the next ones read it"""
+    cache = ManifestDiskCache(tmp_path)
+    expected = MPDSnapshot.from_mpd(Parser.from_file(INPUT_FILE))
+    assert cache.load_file(INPUT_FILE) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.load_file(INPUT_FILE) == expected
+    assert ManifestDiskCache(tmp_path).load_file(INPUT_FILE) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(list(tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}"))) == 1
+
+
+def test_disk_cache_drops_unreadable_entries(tmp_path):
+    """a corrupt entry counts as a miss and is replaced"""
+    cache = ManifestDiskCache(tmp_path)
+    manifest = '<MPD type="static"><Period id="1"/></MPD>'
+    cache.load_string(manifest)
+    entry, = tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}")
+    entry.write_bytes(b"garbage")
+    assert cache.load_string(manifest).periods[0].id == "1"
+    assert cache.misses == 2
+    # cut inside the header size
+    entry.write_bytes(SNAPSHOT_MAGIC + b"\x01")
+    assert cache.load_string(manifest).periods[0].id == "1"
+    assert cache.misses == 3
+
+
+def test_disk_cache_drops_truncated_entries(tmp_path):
+    """an entry cut inside its segment columns counts as a miss, not as a hit with short columns"""
+    cache = ManifestDiskCache(tmp_path)
+    manifest = (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic"><Period id="1"><AdaptationSet>'
+        '<SegmentTemplate timescale="10"><SegmentTimeline><S t="0" d="20" r="3"/></SegmentTimeline></SegmentTemplate>'
+        '<Representation id="v1" bandwidth="1000"/></AdaptationSet></Period></MPD>'
+    )
+    expected = cache.load_string(manifest)
+    assert len(expected.segment_numbers) == 4
+    entry, = tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}")
+    entry.write_bytes(entry.read_bytes()[:-8])
+    assert cache.load_string(manifest) == expected
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert MPDSnapshot.from_buffer(entry.read_bytes()) == expected
+
+
+def test_disk_cache_removes_failed_writes(tmp_path, monkeypatch):
+    """a write that fails leaves neither an entry nor a temporary file"""
+    def fail_replace(*_):
+        raise OSError("No space left on device")
+
+    cache = ManifestDiskCache(tmp_path)
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with raises(OSError):
+        cache.load_file(INPUT_FILE)
+    assert not list(tmp_path.iterdir())
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    """entries are removed oldest first once the directory is over max_bytes"""
+    cache = ManifestDiskCache(tmp_path)
+    manifests = [f'<MPD type="static"><Period id="{index}"/></MPD>' for index in range(3)]
+    cache.load_string(manifests[0])
+    entry_size = next(tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}")).stat().st_size
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    os.utime(tmp_path / f"{cache.key(manifests[0].encode())}{CACHE_ENTRY_SUFFIX}", (0, 0))
+    cache.load_string(manifests[1])
+    cache.load_string(manifests[2])
+    stored = {path.name for path in tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}")}
+    assert stored == {f"{cache.key(manifest.encode())}{CACHE_ENTRY_SUFFIX}" for manifest in manifests[1:]}
+
+
+def test_disk_cache_scans_only_over_max_bytes(tmp_path, monkeypatch):
+    """the directory is scanned on the first store, then only when the counted size goes over max_bytes"""
+    cache = ManifestDiskCache(tmp_path)
+    scans = []
+    evict = cache._evict  # pylint: disable=protected-access
+    monkeypatch.setattr(cache, "_evict", lambda: scans.append(evict()))
+    for index in range(3):
+        cache.load_string(f'<MPD type="static"><Period id="{index}"/></MPD>')
+    assert len(scans) == 1
+    cache.max_bytes = 0
+    cache.load_string('<MPD type="static"><Period id="3"/></MPD>')
+    assert len(scans) == 2
+    assert not list(tmp_path.glob(f"*{CACHE_ENTRY_SUFFIX}"))
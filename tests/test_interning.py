@@ -0,0 +1,99 @@
+"""
+Test the sharing of repeated values between manifests
+"""
+import gc
+
+from pytest import raises
+
+from mpd_parser.memory_cache import ParsedManifestCache
+from mpd_parser.models.interning import InternPool, intern_values
+from mpd_parser.parser import Parser
+
+LADDER_MPD = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT10S">
+  <Period id="p0">
+    <AdaptationSet id="1" mimeType="video/mp4">
+      <Role schemeIdUri="urn:mpeg:dash:role:2011" value="main"/>
+      <Representation id="v1" bandwidth="1000000" codecs="avc1.64001f">
+        <ContentProtection schemeIdUri="urn:mpeg:dash:mp4protection:2011" value="cenc"/>
+        <SupplementalProperty schemeIdUri="urn:example:hdr" value="pq"/>
+      </Representation>
+      <Representation id="v2" bandwidth="2000000" codecs="avc1.64001f">
+        <ContentProtection schemeIdUri="urn:mpeg:dash:mp4protection:2011" value="cenc"/>
+        <SupplementalProperty schemeIdUri="urn:example:hdr" value="hlg"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+
+def representations(mpd):
+    """ every representation of the manifest """
+    return [rep for period in mpd.periods for aset in period.adaptation_sets for rep in aset.representations]
+
+
+def test_intern_values_shares_descriptors_and_strings():
+    """ identical descriptors and strings are shared within and across manifests, other values are kept """
+    pool = InternPool()
+    first = intern_values(Parser.from_string(LADDER_MPD), pool)
+    second = intern_values(Parser.from_string(LADDER_MPD), pool)
+    (v1, v2), (other_v1, _) = representations(first), representations(second)
+
+    assert v1.content_protections[0] is v2.content_protections[0] is other_v1.content_protections[0]
+    assert v1.content_protections[0].value == "cenc"
+    assert v1.supplemental_properties[0] is not v2.supplemental_properties[0]
+    assert v2.supplemental_properties[0].value == "hlg"
+    assert v1.codecs is other_v1.codecs
+    assert v1.supplemental_properties[0].scheme_id_uri is v2.supplemental_properties[0].scheme_id_uri
+    assert first.periods[0].adaptation_sets[0].roles[0] is second.periods[0].adaptation_sets[0].roles[0]
+    # the manifest elements are untouched
+    assert Parser.to_string(first) == Parser.to_string(Parser.from_string(LADDER_MPD))
+
+
+def test_intern_pool_drops_unused_tags():
+    """ shared tags live as long as an interned manifest uses them """
+    pool = InternPool()
+    mpd = intern_values(Parser.from_string(LADDER_MPD), pool)
+    assert len(pool.tags) == 4
+    del mpd
+    gc.collect()
+    assert len(pool.tags) == 0
+    assert "avc1.64001f" in pool.strings
+
+
+def test_memory_cache_interns_loaded_manifests():
+    """ manifests cached with an intern pool share their descriptors """
+    cache = ParsedManifestCache(intern_pool=InternPool())
+    first = cache.get("first", lambda: Parser.from_string(LADDER_MPD))
+    second = cache.get("second", lambda: Parser.from_string(LADDER_MPD))
+    assert representations(first)[0].content_protections[0] is representations(second)[0].content_protections[0]
+
+
+def test_shared_tags_refuse_assignment():
+    """ an assignment to a shared tag would change every interned manifest and none of their documents """
+    pool = InternPool()
+    mpd = intern_values(Parser.from_string(LADDER_MPD), pool)
+    protection = representations(mpd)[0].content_protections[0]
+    with raises(AttributeError):
+        protection.value = "cbcs"
+    with raises(AttributeError):
+        protection.update(value="cbcs")
+    assert protection.value == "cenc"
+    other = intern_values(Parser.from_string(LADDER_MPD), pool)
+    assert representations(other)[1].content_protections[0].value == "cenc"
+
+
+def test_update_from_replaces_shared_tags():
+    """ an update drops the shared tags of the changed subtrees, the values are read again from the manifest """
+    pool = InternPool()
+    mpd = intern_values(Parser.from_string(LADDER_MPD), pool)
+    other = intern_values(Parser.from_string(LADDER_MPD), pool)
+    assert mpd.update_from(Parser.from_string(LADDER_MPD.replace('value="cenc"', 'value="cbcs"', 1)))
+    assert 'value="cbcs"' in Parser.to_string(mpd)
+    assert representations(mpd)[0].content_protections[0].value == "cbcs"
+    assert representations(mpd)[1].content_protections[0].value == "cenc"
+    assert representations(other)[0].content_protections[0].value == "cenc"
+    # the refreshed tags belong to the manifest and take assignments again
+    representations(mpd)[0].content_protections[0].value = "cens"
+    assert 'value="cens"' in Parser.to_string(mpd)
@@ -0,0 +1,114 @@
+"""
+Test the live manifest refresh manager against a local HTTP stand-in server
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pytest import fixture, mark
+
+from mpd_parser.live import RefreshManager, extract_publish_time
+from mpd_parser.parser import Parser
+
+LIVE_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="{type}" minimumUpdatePeriod="PT0.05S" '
+    'publishTime="{publish_time}">{location}<Period id="p0"/></MPD>'
+)
+
+# publishTime seconds of the n-th /live.mpd response
+PUBLISHED_VERSIONS = {1: 0, 2: 0, 3: 2, 4: 2, 5: 4}
+
+
+class LiveOriginHandler(BaseHTTPRequestHandler):
+    """
+        /moved.mpd points to /live.mpd with a Location tag.
+    /live.mpd publishes a new version on the third request and turns static on the fifth.
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == "/moved.mpd":
+            body = LIVE_TEMPLATE.format(type="dynamic", publish_time="2024-01-01T00:00:00Z",
+                                        location="<Location>/live.mpd</Location>")
+        else:
+            served = self.requests.count("/live.mpd")
+            body = LIVE_TEMPLATE.format(
+                type="static" if served >= 5 else "dynamic",
+                publish_time=f"2024-01-01T00:00:0{PUBLISHED_VERSIONS[served]}Z",
+                location="",
+            )
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@fixture(name="origin")
+def fixture_origin():
+    LiveOriginHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LiveOriginHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@mark.parametrize(
+    "payload, expected",
+    [
+        (b'<MPD type="dynamic" publishTime="2024-01-01T00:00:00Z">', "2024-01-01T00:00:00Z"),
+        (b"<?xml version='1.0'?>\n<dash:MPD\n  publishTime='x' >", "x"),
+        (b'<MPD type="static"><Period publishTime="no"/></MPD>', None),
+    ],
+)
+def test_extract_publish_time(payload, expected):
+    """publishTime is read from the root tag only"""
+    assert extract_publish_time(payload) == expected
+
+
+@mark.parametrize("incremental", [False, True])
+def test_refresh_manager(origin, monkeypatch, incremental):
+    """follows Location, parses only new publishTimes off the loop thread and stops once the manifest is static"""
+    updates = []
+    # kept alive, so that their ids are not reused
+    mpd_objects = []
+    parse_threads = set()
+    from_bytes = Parser.from_bytes
+
+    def recording_from_bytes(*args, **kwargs):
+        parse_threads.add(threading.get_ident())
+        return from_bytes(*args, **kwargs)
+
+    monkeypatch.setattr(Parser, "from_bytes", recording_from_bytes)
+
+    async def on_update(manifest):
+        updates.append((manifest.current_url.rsplit("/", 1)[-1], manifest.publish_time, manifest.mpd.type))
+        mpd_objects.append(manifest.mpd)
+
+    async def run():
+        async with RefreshManager(on_update=on_update, incremental=incremental) as manager:
+            manifest = manager.add(f"http://127.0.0.1:{origin.server_port}/moved.mpd")
+            await asyncio.wait_for(manifest.task, timeout=5)
+        return manifest
+
+    manifest = asyncio.run(run())
+    assert LiveOriginHandler.requests == ["/moved.mpd"] + ["/live.mpd"] * 5
+    assert updates == [
+        ("live.mpd", "2024-01-01T00:00:00Z", "dynamic"),
+        ("live.mpd", "2024-01-01T00:00:02Z", "dynamic"),
+        ("live.mpd", "2024-01-01T00:00:04Z", "static"),
+    ]
+    assert manifest.fetches == 6
+    assert manifest.parses == 3
+    assert len(set(map(id, mpd_objects))) == (1 if incremental else 3)
+    assert parse_threads and threading.get_ident() not in parse_threads
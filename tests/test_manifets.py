@@ -104,7 +104,7 @@ def test_touch_all_manifest_properties(input_file, parsing_type):
         Test each manifest by walking over it's xml tree.
     Does not verify values.
     """
-    if parsing_type == Parser.from_file:
+    if parsing_type == Parser.from_file:  # pylint: disable=comparison-with-callable
         mpd = parsing_type(input_file)
         touch_attributes(mpd)
         return
@@ -175,4 +175,125 @@ def test_from_url_error_handling(monkeypatch, exception, patch_func):
     monkeypatch.setattr("mpd_parser.parser.etree.parse", fake_parse)
     monkeypatch.setattr("mpd_parser.parser.urlopen", dummy_urlopen)
     with raises(exception):
-        Parser.from_url("http://dummy.url/manifest.mpd")
\ No newline at end of file
+        Parser.from_url("http://dummy.url/manifest.mpd")
+
+def test_stream_file_periods():
+    """ periods are emitted in order and detached from the tree once the next one is requested """
+    input_file = f"{MANIFESTS_DIR}aws-media-tailor-vod-personalized-response-manifest.mpd"
+    expected_ids = [period.id for period in Parser.from_file(input_file).periods]
+    streamed_ids = []
+    previous_element = None
+    for period in Parser.stream_file(input_file):
+        assert period.element.getparent() is not None
+        if previous_element is not None:
+            assert previous_element.getparent() is None
+            assert len(previous_element) == 0
+        streamed_ids.append(period.id)
+        assert period.adaptation_sets
+        previous_element = period.element
+    assert streamed_ids == expected_ids
+
+
+def test_stream_file_adaptation_sets():
+    """ adaptation sets can be streamed as well, their ancestors remain reachable """
+    input_file = f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"
+    expected = [len(aset.representations) for aset in Parser.from_file(input_file).periods[0].adaptation_sets]
+    streamed = []
+    for adaptation_set in Parser.stream_file(input_file, tag="AdaptationSet"):
+        assert adaptation_set.element.getparent().getparent().get("type") == "static"
+        streamed.append(len(adaptation_set.representations))
+    assert streamed == expected
+
+
+def test_stream_file_error_handling():
+    """ streaming errors are translated like the other factories """
+    with raises(UnknownElementTreeParseError):
+        list(Parser.stream_file("dummy_file.mpd"))
+
+
+@mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_from_bytes(wrap):
+    """ raw bytes are parsed as is and the declared encoding is kept """
+    with open(f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd", mode="rb") as manifest_file:
+        mpd = Parser.from_bytes(wrap(manifest_file.read()))
+    assert mpd.encoding == "UTF-8"
+    assert mpd.type == "static"
+    assert mpd.program_informations[0].more_info_url == "http://gpac.sourceforge.net"
+
+
+def test_from_bytes_keeps_non_utf8_encoding():
+    """ the payload is decoded by lxml according to its declaration """
+    mpd = Parser.from_bytes(b'<?xml version="1.0" encoding="ISO-8859-1"?><MPD id="caf\xe9"/>')
+    assert mpd.encoding == "ISO-8859-1"
+    assert mpd.id == "café"
+
+
+@mark.parametrize(
+    "exception,patch_func",
+    [
+        (UnicodeDeclaredError, lambda: ValueError("Unicode something")),
+        (UnknownValueError, lambda: ValueError("Some other value error")),
+        (UnknownElementTreeParseError, lambda: RuntimeError("Some runtime error")),
+    ]
+)
+def test_from_bytes_error_handling(monkeypatch, exception, patch_func):
+    def fake_parse(*args, **kwargs):
+        raise patch_func()
+    monkeypatch.setattr("mpd_parser.parser.etree.fromstring", fake_parse)
+    with raises(exception):
+        Parser.from_bytes(b"<MPD></MPD>")
+
+
+def test_parse_many(tmp_path):
+    """ files are parsed on worker processes, a broken file does not stop the batch """
+    broken_file = tmp_path / "broken.mpd"
+    broken_file.write_text("<MPD><Period>")
+    input_files = [f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd", broken_file]
+    results = list(Parser.parse_many(input_files, workers=2))
+    assert [result.path for result in results] == [str(path) for path in input_files]
+    assert results[0].ok
+    assert results[0].value.type == "static"
+    assert results[0].value.periods == 1
+    assert results[0].value.adaptation_sets == 1
+    assert not results[1].ok
+    assert isinstance(results[1].error, UnknownElementTreeParseError)
+
+
+def summarize_periods_only(mpd):
+    """ summarizer failing on manifests without a Location, as a user function may """
+    if not mpd.locations:
+        raise KeyError("no Location")
+    return len(mpd.periods)
+
+
+def test_parse_many_keeps_any_error_per_file(tmp_path):
+    """ errors of the summarizer and missing files stay in their results """
+    input_files = [f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd", tmp_path / "missing.mpd"]
+    results = list(Parser.parse_many(input_files, workers=1, summarize=summarize_periods_only))
+    assert isinstance(results[0].error, KeyError)
+    assert not results[1].ok
+
+
+def test_parse_many_with_summarizer():
+    """ any picklable function can turn the parsed manifest into the result """
+    input_file = f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"
+    result, = Parser.parse_many([input_file], workers=1, summarize=Parser.to_string)
+    assert result.value == Parser.to_string(Parser.from_file(input_file))
+
+
+def test_parse_concurrently(tmp_path):
+    """ sources are dispatched by kind and results keep the given order """
+    input_file = f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"
+    with open(input_file, mode="rb") as manifest_file:
+        payload = manifest_file.read()
+    broken_file = tmp_path / "broken.mpd"
+    broken_file.write_text("<MPD><Period>")
+    sources = [payload, '<MPD id="text"/>', input_file, broken_file]
+
+    results = Parser.parse_concurrently(sources, workers=4, return_exceptions=True)
+    assert results[0].encoding == "UTF-8"
+    assert results[1].id == "text"
+    assert results[2].type == "static"
+    assert isinstance(results[3], UnknownElementTreeParseError)
+    with raises(UnknownElementTreeParseError):
+        Parser.parse_concurrently(sources, workers=4)
@@ -0,0 +1,48 @@
+"""
+Test the eager materialization of parsed manifests
+"""
+import os
+
+from pytest import mark
+
+from mpd_parser.models.base_tags import Tag
+from mpd_parser.models.composite_tags import MPD
+from mpd_parser.models.materialize import MATERIALIZE_ERRORS, materialize_table
+from mpd_parser.parser import Parser
+from tests.conftest import MANIFESTS_DIR
+
+
+def assert_same_values(eager_tag: Tag, lazy_tag: Tag):
+    """ every value cached by the eager walk equals the one the lazy getter returns """
+    assert type(eager_tag) is type(lazy_tag)
+    attributes, getters = materialize_table(type(eager_tag))
+    for name in [name for name, _, _ in attributes] + [name for name, _ in getters]:
+        try:
+            lazy_value = getattr(lazy_tag, name)
+        except MATERIALIZE_ERRORS:
+            assert name not in vars(eager_tag)
+            continue
+        eager_value = vars(eager_tag)[name]
+        if isinstance(lazy_value, Tag):
+            assert_same_values(eager_value, lazy_value)
+        elif isinstance(lazy_value, list) and lazy_value and isinstance(lazy_value[0], Tag):
+            assert len(eager_value) == len(lazy_value)
+            for eager_member, lazy_member in zip(eager_value, lazy_value):
+                assert_same_values(eager_member, lazy_member)
+        elif name != "child_index":
+            assert eager_value == lazy_value
+
+
+@mark.parametrize("input_file", [f"{MANIFESTS_DIR}{name}" for name in os.listdir(MANIFESTS_DIR)])
+def test_eager_parse_matches_lazy_values(input_file):
+    assert_same_values(Parser.from_file(input_file, eager=True), Parser.from_file(input_file))
+
+
+def test_materialize_table_follows_fields():
+    """ attributes come from the Attr fields, each name is computed once, with the most derived getter """
+    attributes, getters = materialize_table(MPD)
+    assert ("cenc", "xlmns:cenc", None) in attributes
+    getters = dict(getters)
+    assert not set(getters) & {name for name, _, _ in attributes}
+    assert next(iter(getters)) == "child_index"
+    assert getters["periods"].__self__ is MPD.tag_fields["periods"]
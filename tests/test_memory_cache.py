@@ -0,0 +1,89 @@
+"""
+Test the in-process cache of parsed manifests
+"""
+import threading
+
+from pytest import raises
+
+from mpd_parser.exceptions import UnknownElementTreeParseError
+from mpd_parser.memory_cache import ParsedManifestCache, estimate_manifest_size
+from mpd_parser.parser import Parser
+from tests.conftest import MANIFESTS_DIR
+
+DYNAMIC_MANIFEST = '<MPD type="dynamic" minimumUpdatePeriod="PT5S"><Period id="{id}"/></MPD>'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_cache_hit_and_miss():
+    """the second request for a file is served from the cache"""
+    cache = ParsedManifestCache()
+    input_file = f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"
+    mpd = cache.from_file(input_file)
+    assert cache.from_file(input_file) is mpd
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.current_bytes == estimate_manifest_size(mpd)
+
+
+def test_memory_cache_dynamic_ttl():
+    """dynamic manifests expire after their minimumUpdatePeriod"""
+    clock = FakeClock()
+    cache = ParsedManifestCache(clock=clock)
+    first = cache.get("live", lambda: Parser.from_string(DYNAMIC_MANIFEST.format(id=1)))
+    clock.now = 4.9
+    assert cache.get("live", lambda: Parser.from_string(DYNAMIC_MANIFEST.format(id=2))) is first
+    clock.now = 5.0
+    assert cache.get("live", lambda: Parser.from_string(DYNAMIC_MANIFEST.format(id=2))).periods[0].id == "2"
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 1
+
+
+def test_memory_cache_evicts_by_size():
+    """least recently used manifests are evicted once max_bytes is exceeded"""
+    cache = ParsedManifestCache(max_bytes=250, size_of=lambda mpd: 100)
+    for key in ("a", "b"):
+        cache.get(key, lambda: Parser.from_string("<MPD/>"))
+    cache.get("a", lambda: Parser.from_string("<MPD/>"))
+    cache.get("c", lambda: Parser.from_string("<MPD/>"))
+    assert list(cache._entries) == ["a", "c"]  # pylint: disable=protected-access
+    assert (cache.evictions, cache.current_bytes) == (1, 200)
+
+
+def test_memory_cache_single_flight():
+    """concurrent requests for a missing key share one load"""
+    cache = ParsedManifestCache()
+    release = threading.Event()
+    loads = []
+
+    def slow_loader():
+        loads.append(1)
+        release.wait()
+        return Parser.from_string("<MPD/>")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", slow_loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while cache.misses + cache.coalesced < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert len({id(mpd) for mpd in results}) == 1
+    assert (cache.misses, cache.coalesced) == (1, 3)
+
+
+def test_memory_cache_does_not_keep_errors():
+    """a failed load raises and the next request tries again"""
+    cache = ParsedManifestCache()
+    with raises(UnknownElementTreeParseError):
+        cache.get("key", lambda: Parser.from_string("<MPD>"))
+    assert cache.get("key", lambda: Parser.from_string("<MPD/>")) is not None
+    assert cache.misses == 2
@@ -0,0 +1,129 @@
+"""
+Test the in place update of a parsed manifest from a newer version
+"""
+from lxml import etree
+
+from mpd_parser.models.composite_tags import MPD
+from mpd_parser.parser import Parser
+
+LIVE_WINDOW_FORMAT = (
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" availabilityStartTime="1970-01-01T00:00:00Z" '
+    'publishTime="{publish_time}">'
+    '<Period id="p0" start="PT0S"><AdaptationSet id="1">'
+    '<SegmentTemplate timescale="10" startNumber="{start_number}">'
+    "<SegmentTimeline>{entries}</SegmentTimeline></SegmentTemplate>"
+    '<Representation id="v1" bandwidth="{bandwidth}"/></AdaptationSet></Period>'
+    "{extra_period}</MPD>"
+)
+
+
+def live_window(publish_time="1", start_number=1, entries='<S t="0" d="20" r="2"/>', bandwidth=1000, extra_period=""):
+    return Parser.from_string(
+        LIVE_WINDOW_FORMAT.format(
+            publish_time=publish_time,
+            start_number=start_number,
+            entries=entries,
+            bandwidth=bandwidth,
+            extra_period=extra_period,
+        )
+    )
+
+
+def test_update_keeps_matched_tags():
+    """matched Periods, AdaptationSets and Representations keep their Tag objects"""
+    mpd = live_window()
+    period = mpd.periods[0]
+    representation = period.adaptation_sets[0].representations[0]
+    assert representation.bandwidth == 1000
+
+    assert mpd.update_from(live_window(publish_time="2", bandwidth=2000))
+    assert mpd.publish_time == "2"
+    assert mpd.periods[0] is period
+    assert period.adaptation_sets[0].representations[0] is representation
+    assert representation.bandwidth == 2000
+
+
+def test_update_slides_the_timeline():
+    """Segment tags that left the window are dropped, the others are kept and only the new ones are added"""
+    mpd = live_window(entries='<S t="0" d="20"/><S d="20" r="1"/><S d="10"/>')
+    segment_template = mpd.periods[0].adaptation_sets[0].segment_template
+    timeline = segment_template.segment_timeline
+    kept_segments = timeline.segments[1:]
+    assert [segment.t for segment in kept_segments] == [None, None]
+    assert [timing.number for timing in segment_template.parsed_segment_timeline] == [1, 2, 3, 4]
+
+    changed = mpd.update_from(
+        live_window(publish_time="2", start_number=2, entries='<S t="20" d="20" r="1"/><S d="10" r="1"/><S d="30"/>')
+    )
+    assert changed
+    assert segment_template.segment_timeline is timeline
+    assert timeline.segments[:2] == kept_segments
+    # the kept entries gained @t and @r, their cached values were dropped
+    assert [(segment.t, segment.d, segment.r) for segment in timeline.segments] == [
+        (20, 20, 1),
+        (None, 10, 1),
+        (None, 30, None),
+    ]
+    assert [dict(entry.attrib) for entry in timeline.element] == [
+        {"t": "20", "d": "20", "r": "1"},
+        {"d": "10", "r": "1"},
+        {"d": "30"},
+    ]
+    assert [timing.start_time for timing in segment_template.parsed_segment_timeline] == [2.0, 4.0, 6.0, 7.0, 8.0]
+
+
+def test_update_adds_and_removes_periods():
+    """periods are matched by id, new ones are added and missing ones removed"""
+    mpd = live_window()
+    first_period = mpd.periods[0]
+    mpd.update_from(live_window(publish_time="2", extra_period='<Period id="p1" start="PT6S"/>'))
+    assert [period.id for period in mpd.periods] == ["p0", "p1"]
+    assert mpd.periods[0] is first_period
+
+    mpd.update_from(live_window(publish_time="3"))
+    assert [period.id for period in mpd.periods] == ["p0"]
+    assert etree.tostring(mpd.element) == etree.tostring(live_window(publish_time="3").element)
+
+
+def test_update_without_changes():
+    """an identical manifest changes nothing"""
+    mpd = live_window()
+    assert not mpd.update_from(live_window())
+    assert isinstance(mpd, MPD)
+
+
+def ladder_window(publish_time="1", changed_bandwidth=None):
+    ladder = "".join(
+        f'<Representation id="v{index}" bandwidth="{changed_bandwidth if index == 7 and changed_bandwidth else 1000}"/>'
+        for index in range(40)
+    )
+    return Parser.from_string(
+        LIVE_WINDOW_FORMAT.format(
+            publish_time=publish_time, start_number=1, entries='<S t="0" d="20"/>', bandwidth=1000, extra_period=""
+        ).replace('<Representation id="v1" bandwidth="1000"/>', ladder)
+    )
+
+
+def test_update_moves_a_large_ladder():
+    """a ladder whose Representations were all read keeps its tags, changed values are read again"""
+    mpd = ladder_window()
+    representations = mpd.periods[0].adaptation_sets[0].representations
+    assert {representation.bandwidth for representation in representations} == {1000}
+
+    new_manifest = ladder_window(publish_time="2")
+    assert mpd.update_from(new_manifest)
+    assert mpd.periods[0].adaptation_sets[0].representations == representations
+    assert representations[7].element.getparent() is new_manifest.periods[0].adaptation_sets[0].element
+
+    assert mpd.update_from(ladder_window(publish_time="3", changed_bandwidth=3000))
+    assert mpd.periods[0].adaptation_sets[0].representations == representations
+    assert [representation.bandwidth for representation in representations[6:9]] == [1000, 3000, 1000]
+
+
+def test_update_detects_changes_in_unread_subtrees():
+    """values that were never read are compared, not visited"""
+    mpd = ladder_window()
+    assert not mpd.update_from(ladder_window())
+    assert mpd.update_from(ladder_window(changed_bandwidth=3000))
+    assert mpd.periods[0].adaptation_sets[0].representations[7].bandwidth == 3000
+    assert Parser.to_string(mpd) == Parser.to_string(ladder_window(changed_bandwidth=3000))
@@ -0,0 +1,45 @@
+"""
+Test module for parser_profiles.py
+"""
+import threading
+
+from mpd_parser.parser import Parser
+from mpd_parser.parser_profiles import COMPACT_PROFILE, DEFAULT_PROFILE, ParserProfile, get_xml_parser
+
+MANIFEST_WITH_BLANKS = """<MPD type="static">
+    <!-- generated -->
+    <Period id="p0">
+        <AdaptationSet id="1"/>
+    </Period>
+</MPD>"""
+
+
+def test_parsers_are_reused_per_thread_and_profile():
+    """the same thread gets the same parser back, other threads and profiles get their own"""
+    assert get_xml_parser() is get_xml_parser(DEFAULT_PROFILE)
+    assert get_xml_parser(ParserProfile(huge_tree=True)) is get_xml_parser(ParserProfile(huge_tree=True))
+    assert get_xml_parser(COMPACT_PROFILE) is not get_xml_parser(DEFAULT_PROFILE)
+    other_thread_parsers = []
+    thread = threading.Thread(target=lambda: other_thread_parsers.append(get_xml_parser()))
+    thread.start()
+    thread.join()
+    assert other_thread_parsers[0] is not get_xml_parser()
+
+
+def test_default_profile_keeps_the_document():
+    """whitespace and comments survive the default profile"""
+    mpd = Parser.from_string(MANIFEST_WITH_BLANKS)
+    assert Parser.to_string(mpd) == MANIFEST_WITH_BLANKS
+
+
+def test_compact_profile_drops_blank_text_and_comments():
+    """the compact profile keeps only the nodes the model reads"""
+    mpd = Parser.from_string(MANIFEST_WITH_BLANKS, profile=COMPACT_PROFILE)
+    assert Parser.to_string(mpd) == '<MPD type="static"><Period id="p0"><AdaptationSet id="1"/></Period></MPD>'
+    assert mpd.periods[0].adaptation_sets[0].id == 1
+
+
+def test_stream_file_accepts_profile():
+    """streaming uses the same profile options"""
+    periods = Parser.stream_file("./../manifests/bigBuckBunny-onDemend.mpd", profile=COMPACT_PROFILE)
+    assert [len(period.adaptation_sets) for period in periods] == [1]
@@ -0,0 +1,71 @@
+"""
+Test the segment tag classes as standalone classes
+"""
+import pytest
+from lxml import etree
+
+from mpd_parser.models.base_tags import SlottedTag
+from mpd_parser.models.segment_tags import CompactSegment, Segment, SegmentList, SegmentTimeline
+
+
+def test_segment_timeline_to_arrays():
+    """S entries are expanded into contiguous arrays without creating Segment tags"""
+    timeline_xml = """
+    <SegmentTimeline xmlns="urn:mpeg:dash:schema:mpd:2011">
+        <S t="1000" d="500" r="2"/>
+        <S d="250"/>
+        <S t="3000" d="400" r="-1"/>
+    </SegmentTimeline>
+    """
+    timeline = SegmentTimeline(etree.fromstring(timeline_xml))
+    arrays = timeline.to_arrays(start_number=10, end=4000)
+    assert arrays.t.tolist() == [1000, 1500, 2000, 2500, 3000, 3400, 3800]
+    assert arrays.d.tolist() == [500, 500, 500, 250, 400, 400, 400]
+    assert arrays.number.tolist() == list(range(10, 17))
+    assert "segments" not in timeline.__dict__
+
+
+def test_compact_segments():
+    """compact segments read the same values as Segment tags, from slots instead of an instance dictionary"""
+    timeline_xml = """
+    <SegmentTimeline xmlns="urn:mpeg:dash:schema:mpd:2011">
+        <S t="1000" d="500" r="2"/>
+        <S d="250"/>
+    </SegmentTimeline>
+    """
+    timeline = SegmentTimeline(etree.fromstring(timeline_xml))
+    compact = timeline.compact_segments()
+    assert [(segment.t, segment.d, segment.r) for segment in compact] == [
+        (segment.t, segment.d, segment.r) for segment in timeline.segments
+    ]
+    assert not hasattr(compact[0], "__dict__")
+    assert "compact_segments" not in timeline.__dict__
+    assert CompactSegment.attribute_names == Segment.attribute_names
+
+    compact[1].t = 2500
+    assert compact[1].element.attrib["t"] == "2500"
+    with pytest.raises(AttributeError):
+        compact[1].n = 3
+
+
+def test_compact_segment_urls():
+    """compact segment urls use the xml names of SegmentURL"""
+    segment_list_xml = """
+    <SegmentList xmlns="urn:mpeg:dash:schema:mpd:2011">
+        <SegmentURL media="1.ts" mediaRange="0-999"/>
+        <SegmentURL media="2.ts" mediaRange="1000-1999"/>
+    </SegmentList>
+    """
+    segment_list = SegmentList(etree.fromstring(segment_list_xml))
+    compact = segment_list.compact_segment_urls()
+    assert [url.media_range for url in compact] == ["0-999", "1000-1999"]
+    assert compact[0].index is None
+    compact[0].media_range = "0-499"
+    assert compact[0].element.attrib["mediaRange"] == "0-499"
+
+
+def test_slotted_tag_needs_slots_for_fields():
+    """a slotted variant must declare a slot for every field it mirrors"""
+    with pytest.raises(TypeError):
+        class _PartialSegment(SlottedTag, fields_of=Segment):  # pylint: disable=unused-variable
+            __slots__ = ("t",)
@@ -0,0 +1,81 @@
+"""
+Test the lxml independent snapshot of a parsed manifest
+"""
+import pickle
+import sys
+
+from pytest import raises
+
+from mpd_parser.parser import Parser
+from mpd_parser.snapshot import MPDSnapshot
+from tests.conftest import MANIFESTS_DIR
+
+TIMELINE_MANIFEST = (
+    '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="dynamic" publishTime="2024-01-01T00:00:00Z">'
+    '<Period id="p0" start="PT10S"><AdaptationSet id="1" contentType="video">'
+    '<SegmentTemplate timescale="10" startNumber="5">'
+    '<SegmentTimeline><S t="0" d="20" r="2"/><S d="10"/></SegmentTimeline></SegmentTemplate>'
+    '<Representation id="v1" bandwidth="1000" codecs="avc1" width="640" height="360"/>'
+    '<Representation id="v2" bandwidth="2000" codecs="avc1" width="1280" height="720"/>'
+    "</AdaptationSet></Period></MPD>"
+)
+
+
+def test_snapshot_from_mpd():
+    """records hold the main values, a shared template is expanded once"""
+    snapshot = MPDSnapshot.from_mpd(Parser.from_string(TIMELINE_MANIFEST))
+    assert snapshot.type == "dynamic"
+    period = snapshot.periods[0]
+    assert (period.id, period.start_in_seconds) == ("p0", 10.0)
+    representations = period.adaptation_sets[0].representations
+    assert [(rep.id, rep.bandwidth, rep.height) for rep in representations] == [("v1", 1000, 360), ("v2", 2000, 720)]
+    assert representations[0].timeline == representations[1].timeline == 0
+    assert len(snapshot.timelines) == 1
+    arrays = snapshot.timeline_arrays(0)
+    assert list(arrays.t) == [0, 20, 40, 60]
+    assert list(arrays.d) == [20, 20, 20, 10]
+    assert list(arrays.number) == [5, 6, 7, 8]
+
+
+def test_snapshot_round_trip():
+    """the buffer form loads back to an equal snapshot, with the columns as views into the buffer"""
+    snapshot = MPDSnapshot.from_mpd(Parser.from_string(TIMELINE_MANIFEST))
+    buffer = bytearray(snapshot.to_bytes())
+    loaded = MPDSnapshot.from_buffer(buffer)
+    assert loaded == snapshot
+    assert isinstance(loaded.segment_times, memoryview)
+    buffer[-8:] = (9).to_bytes(8, sys.byteorder)
+    assert loaded.segment_numbers[-1] == 9
+    assert pickle.loads(pickle.dumps(loaded)) == loaded
+
+
+def test_snapshot_without_timelines():
+    """a manifest without SegmentTimeline has empty columns"""
+    snapshot = MPDSnapshot.from_mpd(Parser.from_file(f"{MANIFESTS_DIR}bigBuckBunny-onDemend.mpd"))
+    assert not snapshot.timelines
+    assert MPDSnapshot.from_buffer(snapshot.to_bytes()) == snapshot
+
+
+def test_snapshot_shared_memory():
+    """readers load the snapshot straight from a shared memory block"""
+    snapshot = MPDSnapshot.from_mpd(Parser.from_string(TIMELINE_MANIFEST))
+    shared_memory = snapshot.to_shared_memory()
+    try:
+        loaded = MPDSnapshot.from_buffer(shared_memory.buf)
+        assert loaded == snapshot
+        del loaded
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def test_snapshot_rejects_other_buffers():
+    with raises(ValueError):
+        MPDSnapshot.from_buffer(b"<MPD/>")
+
+
+def test_snapshot_rejects_truncated_buffers():
+    """a buffer cut inside the columns, even at a column item boundary, is not loaded"""
+    data = MPDSnapshot.from_mpd(Parser.from_string(TIMELINE_MANIFEST)).to_bytes()
+    with raises(ValueError):
+        MPDSnapshot.from_buffer(data[:-8])
@@ -0,0 +1,48 @@
+"""
+Test module for timeline_utils.py
+"""
+from pytest import mark
+
+from mpd_parser.timeline_utils import SegmentTiming, SegmentTimingTable, expand_timeline
+
+
+@mark.parametrize(
+    "entries, start_number, end, expected",
+    [
+        ([(0, 2, None)], 1, None, ([0], [2], [1])),
+        ([(None, 2, 2), (None, 3, None)], 1, None, ([0, 2, 4, 6], [2, 2, 2, 3], [1, 2, 3, 4])),
+        ([(100, 2, 1), (110, 5, None)], 7, None, ([100, 102, 110], [2, 2, 5], [7, 8, 9])),
+        ([(0, 2, -1), (7, 3, None)], 1, None, ([0, 2, 4, 6, 7], [2, 2, 2, 2, 3], [1, 2, 3, 4, 5])),
+        ([(0, 4, -1)], 1, 10, ([0, 4, 8], [4, 4, 4], [1, 2, 3])),
+        ([(0, 4, -1)], 1, None, ([0], [4], [1])),
+        ([], 1, None, ([], [], [])),
+    ],
+)
+def test_expand_timeline(entries, start_number, end, expected):
+    """runs are expanded with repeats, implicit start times and open ended repeats"""
+    arrays = expand_timeline(entries, start_number=start_number, end=end)
+    assert (arrays.t.tolist(), arrays.d.tolist(), arrays.number.tolist()) == expected
+
+
+def test_segment_timing_is_slotted():
+    """segment timing records have no per-instance dict"""
+    timing = SegmentTiming(start_time=0.0, duration=2.0, number=1)
+    assert not hasattr(timing, "__dict__")
+
+
+def test_segment_timing_table():
+    """the table round trips timings and supports indexing and slicing"""
+    timings = [
+        SegmentTiming(start_time=0.0, duration=2.0, number=1),
+        SegmentTiming(start_time=2.0, duration=2.0, number=2, availability_start=102.0, availability_end=104.0),
+        SegmentTiming(start_time=4.0, duration=1.5, number=3, availability_start=104.0, availability_end=105.5),
+    ]
+    table = SegmentTimingTable.from_timings(timings)
+    assert len(table) == 3
+    assert list(table) == timings
+    assert table[-1] == timings[-1]
+    assert table[0].availability_start is None
+    sliced = table[1:]
+    assert isinstance(sliced, SegmentTimingTable)
+    assert list(sliced) == timings[1:]
+    assert table.number.tolist() == [1, 2, 3]
@@ -0,0 +1,25 @@
+"""
+Test module for the precompiled xpath registry
+"""
+from lxml import etree
+
+from mpd_parser.constants import ANCESTOR_AXIS
+from mpd_parser.xpath_lookups import lookup_xpath
+
+
+def test_lookup_xpath_is_compiled_once():
+    """the same evaluator is returned for the same target and axis"""
+    assert lookup_xpath("Period") is lookup_xpath("Period")
+    assert lookup_xpath("Period") is not lookup_xpath("Period", ANCESTOR_AXIS)
+
+
+def test_lookup_xpath_axes():
+    """child lookups ignore namespaces, ancestor lookups return the closest match"""
+    root = etree.fromstring(
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011"><Period id="p0"><AdaptationSet/></Period></MPD>'
+    )
+    periods = lookup_xpath("Period")(root)
+    assert [period.get("id") for period in periods] == ["p0"]
+    adaptation_set = periods[0][0]
+    assert lookup_xpath("Period", ANCESTOR_AXIS)(adaptation_set) == periods
+    assert lookup_xpath("MPD", ANCESTOR_AXIS)(adaptation_set) == [root]